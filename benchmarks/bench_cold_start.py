@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold-start-to-first-response time of the BeerDB app
+
+Each run starts a fresh interpreter in an empty working directory,
+imports the app, and serves one request through the Flask test client.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--runs N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = '''
+import json, time
+start = time.perf_counter()
+from src.app import app, warm_up
+imported = time.perf_counter()
+if {warm}:
+    warm_up(app)
+warmed = time.perf_counter()
+response = app.test_client().get({path!r})
+done = time.perf_counter()
+print(json.dumps({{
+    'status': response.status_code,
+    'import': imported - start,
+    'warm_up': warmed - imported,
+    'first_response': done - warmed,
+    'total': done - start
+}}))
+'''
+
+
+def run_once(path: str, warm: bool) -> dict:
+    """Time one cold start in a subprocess"""
+    with tempfile.TemporaryDirectory() as cwd:
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+        output = subprocess.check_output(
+            [sys.executable, '-c', CHILD.format(path=path, warm=warm)],
+            cwd=cwd, env=env
+        )
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    scenarios = [
+        ('lazy, /health/live', '/health/live', False),
+        ('lazy, /api/beers', '/api/beers', False),
+        ('warm-up, /api/beers', '/api/beers', True),
+    ]
+
+    print(f"{'scenario':<22}{'import ms':>12}{'warm-up ms':>12}{'first resp ms':>15}{'total ms':>12}")
+    for name, path, warm in scenarios:
+        runs = [run_once(path, warm) for _ in range(args.runs)]
+        median = {key: statistics.median(run[key] for run in runs) * 1000
+                  for key in ('import', 'warm_up', 'first_response', 'total')}
+        print(f"{name:<22}{median['import']:>12.1f}{median['warm_up']:>12.1f}"
+              f"{median['first_response']:>15.1f}{median['total']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark /metrics scrape latency in multi-process mode
+
+Simulates worker mmap files with many labeled series, including files
+left behind by workers that have exited, and times one scrape with the
+stock collector, after compacting dead workers, and with the TTL cache.
+
+Usage:
+    python benchmarks/bench_metrics.py [--workers N] [--dead N] [--series N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from prometheus_client import CollectorRegistry, generate_latest
+from prometheus_client.mmap_dict import MmapedDict, mmap_key
+from prometheus_client.multiprocess import MultiProcessCollector
+
+from src.api.metrics import CachedMultiProcessCollector, mark_worker_dead
+
+
+def write_worker(path: str, pid: int, series: int):
+    """Write a counter and a summary file shaped like one BeerDB worker"""
+    counters = MmapedDict(os.path.join(path, f'counter_{pid}.db'))
+    summaries = MmapedDict(os.path.join(path, f'summary_{pid}.db'))
+    for i in range(series):
+        labels = ['endpoint', 'outcome']
+        values = [f'endpoint_{i % 50}', f'outcome_{i // 50}']
+        counters.write_value(mmap_key('admission_requests', 'admission_requests_total',
+                                      labels, values, 'Admission decisions'), float(i), 0.0)
+        summaries.write_value(mmap_key('request_processing_seconds', 'request_processing_seconds_sum',
+                                       labels, values, 'Request time'), 0.5, 0.0)
+        summaries.write_value(mmap_key('request_processing_seconds', 'request_processing_seconds_count',
+                                       labels, values, 'Request time'), 10.0, 0.0)
+    counters.close()
+    summaries.close()
+
+
+def time_scrape(registry, runs: int) -> float:
+    """Median scrape time in milliseconds"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        generate_latest(registry)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--dead', type=int, default=32, help='Exited workers whose files remain')
+    parser.add_argument('--series', type=int, default=500, help='Labeled series per metric per worker')
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        for pid in range(args.workers + args.dead):
+            write_worker(path, pid, args.series)
+
+        stock = CollectorRegistry()
+        MultiProcessCollector(stock, path)
+        results = [('stock, dead files kept', time_scrape(stock, args.runs))]
+
+        for pid in range(args.workers, args.workers + args.dead):
+            mark_worker_dead(pid, path)
+        results.append(('stock, dead compacted', time_scrape(stock, args.runs)))
+
+        uncached = CollectorRegistry()
+        CachedMultiProcessCollector(uncached, path, ttl=0)
+        results.append(('cached collector, ttl=0', time_scrape(uncached, args.runs)))
+
+        cached = CollectorRegistry()
+        CachedMultiProcessCollector(cached, path, ttl=60)
+        results.append(('cached collector, warm', time_scrape(cached, args.runs)))
+
+    print(f"{args.workers} live workers, {args.dead} dead, {args.series} series per metric")
+    print(f"{'scenario':<28}{'scrape ms':>12}")
+    for name, millis in results:
+        print(f"{name:<28}{millis:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
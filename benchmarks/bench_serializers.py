@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark response bytes/sec for each installed serializer
+
+Encodes a synthetic /api/beers payload shaped like DatabaseManager rows,
+with ingredients stored as JSON text.
+
+Usage:
+    python benchmarks/bench_serializers.py [--beers N] [--repeat N]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from flask import Flask, jsonify
+
+from src.api.serializers import available_serializers, wrap_raw_fields
+
+
+def make_rows(count: int) -> list:
+    """Rows as returned by DatabaseManager.get_all_beers"""
+    ingredients = {
+        'malt': [{'name': f'Malt {i}', 'amount': {'value': 3.3, 'unit': 'kilograms'}} for i in range(3)],
+        'hops': [{'name': f'Hop {i}', 'amount': {'value': 25, 'unit': 'grams'},
+                  'add': 'start', 'attribute': 'bitter'} for i in range(5)],
+        'yeast': 'Wyeast 1056 - American Ale'
+    }
+    return [{
+        'id': i,
+        'name': f'Beer {i}',
+        'tagline': 'A Real Bitter Experience.',
+        'abv': 4.5 + i % 7,
+        'ibu': 60.0,
+        'description': 'A light, crisp and bitter IPA brewed with English and American hops. ' * 3,
+        'ingredients': json.dumps(ingredients),
+        'created_at': '2024-01-01 00:00:00'
+    } for i in range(count)]
+
+
+def measure(encode, repeat: int) -> tuple:
+    """Return (bytes per response, bytes/sec) for an encode callable"""
+    size = len(encode())
+    start = time.perf_counter()
+    for _ in range(repeat):
+        encode()
+    elapsed = time.perf_counter() - start
+    return size, size * repeat / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--beers', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.beers)
+    app = Flask(__name__)
+
+    def jsonify_baseline():
+        with app.app_context():
+            return jsonify({'status': 'success', 'count': len(rows), 'beers': rows}).get_data()
+
+    results = [('flask jsonify (baseline)',) + measure(jsonify_baseline, args.repeat)]
+
+    for name, serializer in available_serializers().items():
+        def encode(serializer=serializer):
+            beers = wrap_raw_fields([dict(row) for row in rows], ('ingredients',))
+            return serializer.dumps({'status': 'success', 'count': len(beers), 'beers': beers})
+        results.append((name,) + measure(encode, args.repeat))
+
+    print(f"{'serializer':<28}{'response bytes':>16}{'MB/s':>10}")
+    for name, size, rate in results:
+        print(f"{name:<28}{size:>16}{rate / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# Gunicorn configuration for BeerDB
+#
+# The app is preloaded in the master so workers fork with the code already
+# imported. Subsystems are lazy, so nothing holding a connection or thread
+# exists before fork; each worker still resets and warms up its own copy
+# before it accepts traffic.
+
+import os
+import tempfile
+
+from src.api.admission import worker_threads
+
+preload_app = True
+
+# Multi-process metrics: workers write to mmap files in this directory and
+# /metrics aggregates them. Must be set before prometheus_client is imported.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'beerdb-metrics'))
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+# Threaded workers, so admission limits and collapsing of identical
+# requests apply across concurrent requests within a worker. The app sizes
+# its admission limits from the same BEERDB_THREADS value.
+worker_class = 'gthread'
+threads = worker_threads()
+
+
+def on_starting(server):
+    """Start from an empty metrics directory"""
+    from src.api.metrics import reset_multiprocess_dir
+
+    reset_multiprocess_dir(os.environ['PROMETHEUS_MULTIPROC_DIR'])
+
+
+def child_exit(server, worker):
+    """Fold a dead worker's metric files into the archive"""
+    from src.api.metrics import mark_worker_dead
+
+    mark_worker_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    """Re-create per-process resources and prebuild caches in the worker"""
+    from src.app import reinit_after_fork, warm_up
+
+    reinit_after_fork(worker.wsgi)
+    warm_up(worker.wsgi)
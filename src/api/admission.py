@@ -0,0 +1,319 @@
+"""
+Admission control for expensive endpoints
+
+Each endpoint gets a concurrency limit and a bounded wait queue. Requests
+that cannot start within the endpoint's latency budget are shed with a
+Retry-After hint instead of piling up behind slow work, and identical
+in-flight calls can be collapsed so callers share one result. A shared
+thread budget caps how many worker threads limited endpoints may hold,
+running or waiting, so cheap endpoints always have a thread to run on.
+
+Limits, budgets and collapsing are per process. Endpoints that must not
+overlap across workers, such as fetch, can also take a file lock; a
+request that finds it held by another worker is shed at once.
+"""
+import fcntl
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Hashable, Optional
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of admitted"""
+
+    def __init__(self, endpoint: str, status_code: int, message: str, retry_after: float):
+        super().__init__(message)
+        self.endpoint = endpoint
+        self.status_code = status_code
+        self.message = message
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After value in whole seconds"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class EndpointLimit:
+    """Concurrency limit with a bounded queue and a wait deadline"""
+
+    def __init__(self, max_concurrent: int, max_queue: int = 0,
+                 queue_timeout: float = 1.0, retry_after: float = 5.0,
+                 follow_timeout: Optional[float] = None):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.follow_timeout = queue_timeout if follow_timeout is None else follow_timeout
+        self.active = 0
+        self.waiting = 0
+        self.following = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, endpoint: str) -> bool:
+        """
+        Take a slot, waiting in the queue up to queue_timeout
+
+        Returns:
+            True if the request had to queue, False if admitted immediately
+
+        Raises:
+            AdmissionRejected: 429 if the queue is full, 503 if the wait
+                exceeded the latency budget
+        """
+        with self._cond:
+            if self.active < self.max_concurrent and self.waiting == 0:
+                self.active += 1
+                return False
+
+            if self.waiting + self.following >= self.max_queue:
+                raise AdmissionRejected(endpoint, 429, 'Too many concurrent requests', self.retry_after)
+
+            self.waiting += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise AdmissionRejected(endpoint, 503, 'Server busy, queue wait exceeded',
+                                                self.retry_after)
+                    self._cond.wait(remaining)
+                self.active += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        """Give a slot back and wake one waiter"""
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def follow(self, endpoint: str, done: threading.Event):
+        """
+        Wait up to follow_timeout for another caller's in-flight result
+
+        Followers hold a place in the queue while they wait. The timeout
+        should cover the whole call being followed, not just a queue wait,
+        or followers give up before the shared result exists.
+
+        Raises:
+            AdmissionRejected: 429 if the queue is full, 503 if the result
+                was not ready within follow_timeout
+        """
+        with self._cond:
+            if self.waiting + self.following >= self.max_queue:
+                raise AdmissionRejected(endpoint, 429, 'Too many concurrent requests', self.retry_after)
+            self.following += 1
+        try:
+            if not done.wait(self.follow_timeout):
+                raise AdmissionRejected(endpoint, 503, 'Server busy, shared result not ready', self.retry_after)
+        finally:
+            with self._cond:
+                self.following -= 1
+
+
+class _Flight:
+    """Result of an in-flight call shared by collapsed callers"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class AdmissionController:
+    """
+    Gate calls to expensive endpoints
+
+    Args:
+        limits: EndpointLimit per endpoint name; other endpoints are not limited
+        decisions: Optional prometheus Counter labelled (endpoint, outcome)
+        in_flight: Optional prometheus Gauge labelled (endpoint)
+        budget: Optional EndpointLimit shared by all limited endpoints; each
+            running, queued or collapsed request holds one slot of it
+        process_locks: Optional lock file path per endpoint; admitted calls
+            also hold an flock on it, so they never overlap across processes
+    """
+
+    def __init__(self, limits: Dict[str, EndpointLimit], decisions=None, in_flight=None,
+                 budget: Optional[EndpointLimit] = None, process_locks: Optional[Dict[str, str]] = None):
+        self.limits = limits
+        self.decisions = decisions
+        self.in_flight = in_flight
+        self.budget = budget
+        self.process_locks = process_locks or {}
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._flights_lock = threading.Lock()
+
+    def _record(self, endpoint: str, outcome: str):
+        if self.decisions is not None:
+            self.decisions.labels(endpoint=endpoint, outcome=outcome).inc()
+
+    def run(self, endpoint: str, fn: Callable[[], Any], collapse_key: Optional[Hashable] = None) -> Any:
+        """
+        Run fn under the endpoint's limit
+
+        Args:
+            endpoint: Endpoint name used to look up the limit and label metrics
+            fn: Work to run once admitted
+            collapse_key: If set, concurrent calls with the same key share
+                the result of the first one instead of running fn again
+
+        Returns:
+            Result of fn
+
+        Raises:
+            AdmissionRejected: If the request is shed
+        """
+        if collapse_key is None:
+            return self._admit(endpoint, fn)
+
+        key = (endpoint, collapse_key)
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            self._follow(endpoint, flight)
+            self._record(endpoint, 'collapsed')
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._admit(endpoint, fn)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _take_budget(self, endpoint: str, limit: EndpointLimit):
+        if self.budget is None:
+            return
+        try:
+            self.budget.acquire(endpoint)
+        except AdmissionRejected as e:
+            self._record(endpoint, 'shed')
+            raise AdmissionRejected(endpoint, e.status_code, e.message,
+                                    max(e.retry_after, limit.retry_after)) from None
+
+    def _release_budget(self):
+        if self.budget is not None:
+            self.budget.release()
+
+    def _follow(self, endpoint: str, flight: _Flight):
+        limit = self.limits.get(endpoint)
+        if limit is None:
+            flight.done.wait()
+            return
+
+        self._take_budget(endpoint, limit)
+        try:
+            limit.follow(endpoint, flight.done)
+        except AdmissionRejected:
+            self._record(endpoint, 'shed')
+            raise
+        finally:
+            self._release_budget()
+
+    def _admit(self, endpoint: str, fn: Callable[[], Any]) -> Any:
+        limit = self.limits.get(endpoint)
+        if limit is None:
+            return fn()
+
+        self._take_budget(endpoint, limit)
+        try:
+            try:
+                queued = limit.acquire(endpoint)
+            except AdmissionRejected:
+                self._record(endpoint, 'shed')
+                raise
+
+            try:
+                with self._process_lock(endpoint, limit):
+                    self._record(endpoint, 'queued' if queued else 'admitted')
+                    if self.in_flight is not None:
+                        self.in_flight.labels(endpoint=endpoint).inc()
+                    try:
+                        return fn()
+                    finally:
+                        if self.in_flight is not None:
+                            self.in_flight.labels(endpoint=endpoint).dec()
+            finally:
+                limit.release()
+        finally:
+            self._release_budget()
+
+    @contextmanager
+    def _process_lock(self, endpoint: str, limit: EndpointLimit):
+        path = self.process_locks.get(endpoint)
+        if path is None:
+            yield
+            return
+
+        with open(path, 'a') as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._record(endpoint, 'shed')
+                raise AdmissionRejected(endpoint, 429, 'Already running in another worker',
+                                        limit.retry_after) from None
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def worker_threads() -> int:
+    """Request threads per worker, from BEERDB_THREADS; shared with gunicorn.conf.py"""
+    return max(1, int(os.environ.get('BEERDB_THREADS', '4')))
+
+
+def default_budget(threads: int) -> EndpointLimit:
+    """
+    Thread budget for limited endpoints
+
+    Reserves a quarter of the threads, at least one, for unlimited
+    endpoints such as health checks, metrics and single-beer lookups.
+    Requests over budget are shed at once rather than queued, since a
+    queued request would hold a thread too.
+    """
+    reserved = max(1, threads // 4)
+    return EndpointLimit(max_concurrent=max(1, threads - reserved), max_queue=0, retry_after=1.0)
+
+
+def default_process_locks(db_path: str) -> Dict[str, str]:
+    """Lock files serializing fetch across workers, kept next to the database"""
+    if db_path == ':memory:':
+        return {}
+    return {'fetch': f'{db_path}.fetch.lock'}
+
+
+def default_limits(threads: int) -> Dict[str, EndpointLimit]:
+    """
+    Limits for the built-in expensive endpoints, sized to the thread budget
+
+    Each endpoint's running plus queued requests fit within the budget.
+    """
+    budget = default_budget(threads).max_concurrent
+    share = max(1, budget // 2)
+    return {
+        # Fetching pages takes several seconds; followers wait for it
+        'fetch': EndpointLimit(max_concurrent=1, max_queue=max(0, min(2, budget - 1)),
+                               queue_timeout=2.0, retry_after=30.0, follow_timeout=60.0),
+        'analyze': EndpointLimit(max_concurrent=share, max_queue=budget - share,
+                                 queue_timeout=1.0, retry_after=5.0),
+        'stats': EndpointLimit(max_concurrent=share, max_queue=budget - share,
+                               queue_timeout=1.0, retry_after=2.0),
+        'beers': EndpointLimit(max_concurrent=budget, max_queue=0, queue_timeout=1.0, retry_after=1.0)
+    }
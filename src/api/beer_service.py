@@ -3,11 +3,14 @@ Beer service module for handling business logic
 """
 import os
 import json
+import time
+import threading
 from typing import Dict, List, Any, Optional
 from data_fetcher.fetcher import Fetcher
 from database.db_manager import DatabaseManager
 from data_analyzer.analyzer import BeerAnalyzer
 from messaging.event_publisher import EventPublisher
+from api.health import HealthChecker
 
 
 class BeerService:
@@ -15,19 +18,101 @@ class BeerService:
     
     def __init__(self, data_dir: str = 'data', db_path: str = 'beer_data.db'):
         self.data_dir = data_dir
-        self.db_manager = DatabaseManager(db_path)
-        self.analyzer = BeerAnalyzer(data_dir)
-        self.event_publisher = EventPublisher()
+        self.db_path = db_path
+        self.last_fetch_success: Optional[float] = None
+        self.health_checker = HealthChecker(self)
         
-        os.makedirs(data_dir, exist_ok=True)
+        self._lock = threading.RLock()
+        self._db_manager: Optional[DatabaseManager] = None
+        self._analyzer: Optional[BeerAnalyzer] = None
+        self._event_publisher: Optional[EventPublisher] = None
+        self._data_dir_ready = False
+    
+    @property
+    def db_manager(self) -> DatabaseManager:
+        """Database manager, opened on first use"""
+        if self._db_manager is None:
+            with self._lock:
+                if self._db_manager is None:
+                    self._db_manager = DatabaseManager(self.db_path)
+        return self._db_manager
+    
+    @property
+    def analyzer(self) -> BeerAnalyzer:
+        """Analyzer, created on first use"""
+        if self._analyzer is None:
+            with self._lock:
+                if self._analyzer is None:
+                    self._ensure_data_dir()
+                    self._analyzer = BeerAnalyzer(self.data_dir)
+        return self._analyzer
+    
+    @property
+    def event_publisher(self) -> EventPublisher:
+        """Event publisher, whose worker thread is started on first use"""
+        if self._event_publisher is None:
+            with self._lock:
+                if self._event_publisher is None:
+                    publisher = EventPublisher()
+                    publisher.subscribe('beer_data_fetched', self._handle_data_fetched)
+                    publisher.subscribe('analysis_complete', self._handle_analysis_complete)
+                    self._event_publisher = publisher
+        return self._event_publisher
+    
+    def _ensure_data_dir(self):
+        """Create the raw data directory once"""
+        if not self._data_dir_ready:
+            os.makedirs(self.data_dir, exist_ok=True)
+            self._data_dir_ready = True
+    
+    def warm_up(self) -> List[str]:
+        """
+        Initialize all subsystems and prebuild caches before serving traffic
+        
+        Warm-up is only an optimization: a failing step is reported and
+        skipped, and is retried lazily on first use, so a corrupt page file
+        or an unreachable database never stops a worker from booting.
+        
+        Returns:
+            Names of the steps that failed
+        """
+        steps = [
+            ('data_dir', self._ensure_data_dir),
+            ('database', lambda: self.db_manager.ping()),
+            ('event_publisher', lambda: self.event_publisher.is_alive()),
+            ('analyzer', lambda: self.analyzer.load_data())
+        ]
+        failed = []
+        for name, step in steps:
+            try:
+                step()
+            except Exception as e:
+                print(f"Warm-up step {name} failed: {e}")
+                failed.append(name)
+        return failed
+    
+    def reset_after_fork(self):
+        """
+        Drop per-process resources inherited from a parent process
         
-        self.event_publisher.subscribe('beer_data_fetched', self._handle_data_fetched)
-        self.event_publisher.subscribe('analysis_complete', self._handle_analysis_complete)
+        Worker threads do not survive fork() and SQLite connections must
+        not be shared across processes, so both are re-created lazily on
+        next use in the child.
+        """
+        self._lock = threading.RLock()
+        self._db_manager = None
+        self._event_publisher = None
+        self.health_checker = HealthChecker(
+            self,
+            ttl=self.health_checker.ttl,
+            max_queue_depth=self.health_checker.max_queue_depth,
+            max_fetch_age=self.health_checker.max_fetch_age
+        )
     
     def _handle_data_fetched(self, data: List[Dict[str, Any]]):
         """Handle when new beer data is fetched"""
         if data and len(data) > 0:
-            self.db_manager.save_beers_batch(data)
+            self.db_manager.save_beers_batch(data, source='punkapi')
             print(f"Saved {len(data)} beers to database")
     
     def _handle_analysis_complete(self, data: Dict[str, Any]):
@@ -46,6 +131,7 @@ class BeerService:
             Dict with operation result
         """
         try:
+            self._ensure_data_dir()
             all_beers = []
             
             for page in range(1, pages + 1):
@@ -57,6 +143,7 @@ class BeerService:
                     fetcher.save_to_file(page_data)
             
             self.event_publisher.publish('beer_data_fetched', all_beers)
+            self.last_fetch_success = time.time()
             
             return {
                 'success': True,
@@ -130,26 +217,76 @@ class BeerService:
                 'statistics': {}
             }
     
-    def health_check(self) -> Dict[str, Any]:
-        """Check service health"""
-        try:
-            self.db_manager.get_all_beers()
+    def get_trends(self, granularity: str = 'day', start: Optional[str] = None,
+                   end: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get time-bucketed trends from the pre-aggregated rollups
+        
+        Args:
+            granularity: 'hour' or 'day'
+            start: Inclusive ISO date or datetime lower bound
+            end: Exclusive ISO date or datetime upper bound
             
+        Returns:
+            Dict with trend buckets ordered by time
+        """
+        try:
+            buckets = self.db_manager.get_trends(granularity, start, end)
             return {
                 'success': True,
-                'status': 'healthy',
-                'service': 'BeerDB API',
-                'database': 'connected'
+                'trends': {
+                    'granularity': granularity,
+                    'start': start,
+                    'end': end,
+                    'buckets': buckets
+                }
             }
             
+        except ValueError as e:
+            return {
+                'success': False,
+                'message': str(e),
+                'status_code': 400,
+                'trends': {}
+            }
         except Exception as e:
             return {
                 'success': False,
-                'status': 'unhealthy',
-                'service': 'BeerDB API',
-                'error': str(e)
+                'message': f'Error getting trends: {str(e)}',
+                'status_code': 500,
+                'trends': {}
+            }
+    
+    def health_check(self) -> Dict[str, Any]:
+        """Check service health"""
+        result = self.readiness()
+        database = result['checks']['database']
+        
+        if result['success']:
+            return {
+                'success': True,
+                'status': result['status'],
+                'service': result['service'],
+                'database': database['status']
             }
+        
+        failed = [name for name, check in result['checks'].items() if not check['ok']]
+        return {
+            'success': False,
+            'status': result['status'],
+            'service': result['service'],
+            'error': database.get('error', f"Failed checks: {', '.join(failed)}")
+        }
+    
+    def liveness(self) -> Dict[str, Any]:
+        """Cheap liveness probe"""
+        return self.health_checker.liveness()
+    
+    def readiness(self) -> Dict[str, Any]:
+        """Cached readiness probe"""
+        return self.health_checker.readiness()
     
     def close(self):
         """Clean up resources"""
-        self.db_manager.close()
+        if self._db_manager is not None:
+            self._db_manager.close()
@@ -0,0 +1,96 @@
+"""
+Health check module with constant-cost liveness and readiness probes
+"""
+import os
+import time
+import threading
+from typing import Dict, Any, Optional
+
+
+class HealthChecker:
+    """Run cheap readiness checks and cache the result for a short TTL"""
+
+    def __init__(self, service, ttl: float = 2.0, max_queue_depth: int = 1000,
+                 max_fetch_age: Optional[float] = None):
+        self.service = service
+        self.ttl = ttl
+        self.max_queue_depth = max_queue_depth
+        self.max_fetch_age = max_fetch_age
+        self._lock = threading.Lock()
+        self._cached: Optional[Dict[str, Any]] = None
+        self._cached_at = 0.0
+
+    def liveness(self) -> Dict[str, Any]:
+        """Report that the process is up; touches no external resources"""
+        return {
+            'success': True,
+            'status': 'alive',
+            'service': 'BeerDB API'
+        }
+
+    def readiness(self) -> Dict[str, Any]:
+        """
+        Report whether the service can take traffic
+
+        Results are cached for `ttl` seconds so a burst of probes runs
+        the underlying checks at most once per interval.
+
+        Returns:
+            Dict with overall status and per-check results
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._cached is not None and now - self._cached_at < self.ttl:
+                return self._cached
+
+            checks = {
+                'database': self._check_database(),
+                'data_dir': self._check_data_dir(),
+                'event_publisher': self._check_event_publisher(),
+                'last_fetch': self._check_last_fetch()
+            }
+            ready = all(check['ok'] for check in checks.values())
+
+            self._cached = {
+                'success': ready,
+                'status': 'healthy' if ready else 'unhealthy',
+                'service': 'BeerDB API',
+                'checks': checks
+            }
+            self._cached_at = now
+            return self._cached
+
+    def _check_database(self) -> Dict[str, Any]:
+        """Verify the database answers a trivial query"""
+        try:
+            self.service.db_manager.ping()
+            return {'ok': True, 'status': 'connected'}
+        except Exception as e:
+            return {'ok': False, 'status': 'disconnected', 'error': str(e)}
+
+    def _check_data_dir(self) -> Dict[str, Any]:
+        """Verify the raw data directory exists and is writable"""
+        data_dir = self.service.data_dir
+        writable = os.path.isdir(data_dir) and os.access(data_dir, os.W_OK)
+        return {'ok': writable, 'status': 'writable' if writable else 'not writable'}
+
+    def _check_event_publisher(self) -> Dict[str, Any]:
+        """Verify the event worker is running and keeping up"""
+        publisher = self.service.event_publisher
+        alive = publisher.is_alive()
+        depth = publisher.queue_depth()
+        return {
+            'ok': alive and depth <= self.max_queue_depth,
+            'worker_alive': alive,
+            'queue_depth': depth
+        }
+
+    def _check_last_fetch(self) -> Dict[str, Any]:
+        """Report the age of the last successful fetch"""
+        last_fetch = self.service.last_fetch_success
+        if last_fetch is None:
+            return {'ok': True, 'age_seconds': None}
+
+        age = time.time() - last_fetch
+        ok = self.max_fetch_age is None or age <= self.max_fetch_age
+        return {'ok': ok, 'age_seconds': round(age, 3)}
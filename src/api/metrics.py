@@ -0,0 +1,162 @@
+"""
+Prometheus registry setup with optional multi-process aggregation
+
+When PROMETHEUS_MULTIPROC_DIR is set, every worker writes its metrics to
+mmap-backed files in that directory and /metrics aggregates all of them,
+so a scrape sees the whole server rather than whichever worker answered.
+Files of dead workers are folded into one archive file per metric type,
+which keeps scrape cost proportional to live workers instead of every
+worker that ever ran. Folding goes through a pending file so it can be
+finished after an interrupted run without counting a worker twice.
+"""
+import fcntl
+import glob
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from prometheus_client import REGISTRY, CollectorRegistry
+from prometheus_client import multiprocess
+from prometheus_client.mmap_dict import MmapedDict
+
+ACCUMULATING_TYPES = ('counter', 'summary', 'histogram')
+ARCHIVE_PID = 'archive'
+LOCK_FILE = '.lock'
+PENDING_SUFFIX = '.pending'
+
+
+def multiprocess_dir() -> Optional[str]:
+    """Shared metrics directory, or None when running single-process"""
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR') or None
+
+
+@contextmanager
+def _locked(path: str, exclusive: bool):
+    """Hold a shared or exclusive lock on the metrics directory"""
+    with open(os.path.join(path, LOCK_FILE), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class CachedMultiProcessCollector:
+    """
+    Aggregate mmap metric files at scrape time, reusing the result for a short TTL
+
+    Reads take a shared lock so they never see a dead worker's samples
+    both in its own file and in the archive mid-compaction.
+    """
+
+    def __init__(self, registry, path: str, ttl: float = 1.0):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._cached = None
+        self._cached_at = 0.0
+        if registry:
+            registry.register(self)
+
+    def collect(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._cached is None or now - self._cached_at >= self.ttl:
+                with _locked(self.path, exclusive=False):
+                    files = glob.glob(os.path.join(self.path, '*.db'))
+                    self._cached = list(multiprocess.MultiProcessCollector.merge(files, accumulate=True))
+                self._cached_at = now
+            return self._cached
+
+
+def build_registry(ttl: float = 1.0):
+    """
+    Registry to expose on /metrics
+
+    Returns:
+        A registry aggregating all workers' files in multi-process mode,
+        otherwise the default in-process registry
+    """
+    path = multiprocess_dir()
+    if path is None:
+        return REGISTRY
+    registry = CollectorRegistry()
+    CachedMultiProcessCollector(registry, path, ttl)
+    return registry
+
+
+def reset_multiprocess_dir(path: str):
+    """Create the metrics directory and remove files left by a previous run"""
+    os.makedirs(path, exist_ok=True)
+    for pattern in ('*.db', '*.tmp', '*' + PENDING_SUFFIX):
+        for filename in glob.glob(os.path.join(path, pattern)):
+            os.remove(filename)
+
+
+def _sum_files(files: List[str]) -> Dict[str, float]:
+    """Sum raw values per key across mmap files"""
+    totals: Dict[str, float] = defaultdict(float)
+    for filename in files:
+        for key, value, _, _ in MmapedDict.read_all_values_from_file(filename):
+            totals[key] += value
+    return totals
+
+
+def _commit_pending(pending_file: str):
+    """
+    Finish a fold whose merged archive was already written
+
+    The pending file holds the archive plus one dead worker's samples and
+    is the commit point: the dead file is removed first, then the pending
+    file replaces the archive. Safe to repeat after a crash at any step.
+    """
+    path, filename = os.path.split(pending_file)
+    typ, pid = filename[:-len(PENDING_SUFFIX)].split('_', 1)
+    dead_file = os.path.join(path, f'{typ}_{pid}.db')
+    if os.path.exists(dead_file):
+        os.remove(dead_file)
+    os.replace(pending_file, os.path.join(path, f'{typ}_{ARCHIVE_PID}.db'))
+
+
+def mark_worker_dead(pid: int, path: Optional[str] = None):
+    """
+    Clean up after a worker exits
+
+    Removes the worker's live gauge files and folds its counter, summary
+    and histogram files into the per-type archive so totals stay
+    monotonic while the number of files stays bounded. Folds left
+    pending by an interrupted earlier call are completed first.
+    """
+    path = path or multiprocess_dir()
+    if path is None:
+        return
+    multiprocess.mark_process_dead(pid, path)
+
+    with _locked(path, exclusive=True):
+        for pending_file in glob.glob(os.path.join(path, '*' + PENDING_SUFFIX)):
+            _commit_pending(pending_file)
+
+        for typ in ACCUMULATING_TYPES:
+            dead_file = os.path.join(path, f'{typ}_{pid}.db')
+            if not os.path.exists(dead_file):
+                continue
+
+            archive_file = os.path.join(path, f'{typ}_{ARCHIVE_PID}.db')
+            sources = [dead_file] + ([archive_file] if os.path.exists(archive_file) else [])
+            totals = _sum_files(sources)
+
+            tmp_file = archive_file + '.tmp'
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            merged = MmapedDict(tmp_file)
+            try:
+                for key, value in totals.items():
+                    merged.write_value(key, value, 0.0)
+            finally:
+                merged.close()
+            pending_file = os.path.join(path, f'{typ}_{pid}{PENDING_SUFFIX}')
+            os.replace(tmp_file, pending_file)
+            _commit_pending(pending_file)
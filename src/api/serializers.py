@@ -0,0 +1,163 @@
+"""
+Response serializers with pluggable JSON backends and optional MessagePack
+"""
+import json
+import re
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, List, Any, Iterable, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class RawJSON:
+    """A value that is already JSON-encoded and is emitted verbatim"""
+    __slots__ = ('value',)
+
+    def __init__(self, value: str):
+        self.value = value
+
+    def __repr__(self):
+        return f"RawJSON({self.value!r})"
+
+
+def wrap_raw_fields(rows: Iterable[Dict[str, Any]], fields: Iterable[str]) -> Iterable[Dict[str, Any]]:
+    """Mark JSON-encoded text columns of database rows as RawJSON in place"""
+    fields = tuple(fields)
+    for row in rows:
+        for field in fields:
+            value = row.get(field)
+            if isinstance(value, str):
+                row[field] = RawJSON(value)
+    return rows
+
+
+class JSONSerializer(ABC):
+    """
+    Base JSON serializer
+
+    RawJSON values are replaced with unique placeholders during encoding
+    and spliced back into the output afterwards, so pre-encoded columns
+    are never decoded and re-encoded. The placeholder nonce and pattern
+    are built once per instance rather than per call.
+    """
+    name = 'json'
+    mimetype = 'application/json'
+
+    def __init__(self):
+        self._nonce = uuid.uuid4().hex
+        self._placeholder = re.compile(rb'"\\u0000' + self._nonce.encode() + rb':(\d+)\\u0000"')
+
+    @abstractmethod
+    def _dumps(self, obj: Any, default) -> bytes:
+        """Encode obj with the backend, calling default for unknown types"""
+
+    def dumps(self, obj: Any) -> bytes:
+        """Encode obj to JSON bytes"""
+        raws: List[bytes] = []
+        nonce = self._nonce
+
+        def default(value):
+            if isinstance(value, RawJSON):
+                raws.append(value.value.encode('utf-8'))
+                return f"\x00{nonce}:{len(raws) - 1}\x00"
+            raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+        encoded = self._dumps(obj, default)
+        if not raws:
+            return encoded
+
+        return self._placeholder.sub(lambda match: raws[int(match.group(1))], encoded)
+
+
+class StdlibJSONSerializer(JSONSerializer):
+    """JSON serializer using the standard library encoder"""
+    name = 'stdlib'
+
+    def _dumps(self, obj: Any, default) -> bytes:
+        return json.dumps(obj, default=default, ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+
+
+class OrjsonSerializer(JSONSerializer):
+    """JSON serializer using orjson"""
+    name = 'orjson'
+
+    def _dumps(self, obj: Any, default) -> bytes:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class MsgpackSerializer:
+    """MessagePack serializer; RawJSON values are decoded so they stay structured"""
+    name = 'msgpack'
+    mimetype = 'application/msgpack'
+
+    def dumps(self, obj: Any) -> bytes:
+        """Encode obj to MessagePack bytes"""
+        return msgpack.packb(obj, default=self._default, use_bin_type=True)
+
+    @staticmethod
+    def _default(value):
+        if isinstance(value, RawJSON):
+            return json.loads(value.value)
+        raise TypeError(f"Object of type {type(value).__name__} is not MessagePack serializable")
+
+
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+
+
+def available_serializers() -> Dict[str, Any]:
+    """All serializers whose backend is installed, keyed by name"""
+    serializers = {'stdlib': StdlibJSONSerializer()}
+    if orjson is not None:
+        serializers['orjson'] = OrjsonSerializer()
+    if msgpack is not None:
+        serializers['msgpack'] = MsgpackSerializer()
+    return serializers
+
+
+def get_json_serializer(name: Optional[str] = None) -> JSONSerializer:
+    """
+    Get a JSON serializer
+
+    Args:
+        name: Backend name; the fastest installed backend is used if omitted
+
+    Returns:
+        JSON serializer instance
+    """
+    if name is None:
+        name = 'orjson' if orjson is not None else 'stdlib'
+    if name == 'orjson' and orjson is not None:
+        return OrjsonSerializer()
+    if name == 'stdlib':
+        return StdlibJSONSerializer()
+    raise ValueError(f"JSON backend not available: {name}")
+
+
+def negotiate(accept_mimetypes, json_serializer: JSONSerializer):
+    """
+    Pick a serializer for a request's Accept header
+
+    Args:
+        accept_mimetypes: werkzeug MIMEAccept from the request
+        json_serializer: serializer used for JSON responses
+
+    Returns:
+        MessagePack serializer if the client prefers it and it is installed,
+        otherwise json_serializer
+    """
+    if msgpack is None:
+        return json_serializer
+    best = accept_mimetypes.best_match((json_serializer.mimetype,) + MSGPACK_MIMETYPES)
+    if best in MSGPACK_MIMETYPES:
+        return MsgpackSerializer()
+    return json_serializer
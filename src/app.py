@@ -3,22 +3,121 @@
 import os
 import sys
 import json
-from flask import Flask, request, jsonify, render_template_string
-from prometheus_client import generate_latest, Summary, Counter
+from flask import Flask, Blueprint, Response, current_app, request, render_template_string
+from prometheus_client import generate_latest, Summary, Counter, Gauge, CONTENT_TYPE_LATEST
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from api.beer_service import BeerService
-
-app = Flask(__name__)
+from api.serializers import get_json_serializer, negotiate, wrap_raw_fields
+from api.admission import (AdmissionController, AdmissionRejected, default_budget, default_limits,
+                           default_process_locks, worker_threads)
+from api.metrics import build_registry
 
 REQUEST_TIME = Summary('request_processing_seconds', 'Time spent processing request')
 FETCH_COUNTER = Counter('data_fetch_total', 'Total number of data fetch operations')
 ANALYSIS_COUNTER = Counter('analysis_runs_total', 'Total number of analysis runs')
+ADMISSION_COUNTER = Counter('admission_requests_total', 'Admission decisions for limited endpoints',
+                            ['endpoint', 'outcome'])
+ADMISSION_IN_FLIGHT = Gauge('admission_in_flight', 'Admitted requests currently running', ['endpoint'],
+                            multiprocess_mode='livesum')
+
+bp = Blueprint('beerdb', __name__)
+
+RAW_JSON_FIELDS = ('ingredients',)
+
+
+def create_app(service: BeerService = None, json_backend: str = None,
+               admission: AdmissionController = None) -> Flask:
+    """
+    Build the Flask application
+    
+    Subsystems of the service are initialized lazily on first use, so
+    this is cheap to call at import time and safe to preload before fork.
+    
+    Args:
+        service: BeerService to serve; a default one is created if omitted
+        json_backend: JSON serializer backend name; defaults to
+            BEERDB_JSON_BACKEND or the fastest installed backend
+        admission: Admission controller for expensive endpoints; defaults
+            to limits and a thread budget sized from BEERDB_THREADS and a
+            fetch lock next to the database, reporting to the admission metrics
+        
+    Returns:
+        Configured Flask app
+    """
+    flask_app = Flask(__name__)
+    service = service or BeerService()
+    flask_app.extensions['beer_service'] = service
+    flask_app.extensions['warm_up_hooks'] = []
+    flask_app.extensions['json_serializer'] = get_json_serializer(
+        json_backend or os.environ.get('BEERDB_JSON_BACKEND')
+    )
+    threads = worker_threads()
+    flask_app.extensions['admission'] = admission or AdmissionController(
+        default_limits(threads), ADMISSION_COUNTER, ADMISSION_IN_FLIGHT, default_budget(threads),
+        default_process_locks(service.db_path)
+    )
+    flask_app.extensions['metrics_registry'] = build_registry()
+    flask_app.register_blueprint(bp)
+    return flask_app
+
+
+def get_service() -> BeerService:
+    """BeerService bound to the current app"""
+    return current_app.extensions['beer_service']
+
+
+def admit(endpoint: str, fn, collapse: bool = False):
+    """Run fn under the endpoint's admission limit, optionally collapsing identical calls"""
+    return current_app.extensions['admission'].run(endpoint, fn, endpoint if collapse else None)
+
+
+def render(payload) -> Response:
+    """Serialize payload in the format negotiated from the Accept header"""
+    serializer = negotiate(request.accept_mimetypes, current_app.extensions['json_serializer'])
+    response = Response(serializer.dumps(payload), mimetype=serializer.mimetype)
+    response.vary.add('Accept')
+    return response
+
+
+def register_warm_up_hook(flask_app: Flask, hook):
+    """Register a callable run with the app during warm-up"""
+    flask_app.extensions['warm_up_hooks'].append(hook)
+
+
+def warm_up(flask_app: Flask):
+    """
+    Initialize subsystems and prebuild caches before accepting traffic
+    
+    Failures are reported and skipped rather than raised, so the worker
+    still boots and serves whatever does work.
+    """
+    flask_app.extensions['beer_service'].warm_up()
+    for hook in flask_app.extensions['warm_up_hooks']:
+        try:
+            hook(flask_app)
+        except Exception as e:
+            print(f"Warm-up hook {getattr(hook, '__name__', hook)} failed: {e}")
 
-beer_service = BeerService()
 
-@app.route("/")
+def reinit_after_fork(flask_app: Flask):
+    """Re-create per-process connections and threads in a forked worker"""
+    flask_app.extensions['beer_service'].reset_after_fork()
+
+
+@bp.errorhandler(AdmissionRejected)
+def admission_rejected(error: AdmissionRejected):
+    """Fast rejection for shed requests"""
+    response = render({
+        'status': 'error',
+        'message': error.message
+    })
+    response.status_code = error.status_code
+    response.headers['Retry-After'] = error.retry_after_header
+    return response
+
+@bp.route("/")
 def main():
     return '''
     <!DOCTYPE html>
@@ -59,7 +158,10 @@ def main():
                 <div class="endpoint">POST /api/fetch - Fetch new data from PunkAPI</div>
                 <div class="endpoint">GET /api/analyze - Run data analysis</div>
                 <div class="endpoint">GET /api/stats - Get summary statistics</div>
+                <div class="endpoint">GET /api/trends?granularity=day&amp;start=&amp;end= - Get trends over time</div>
                 <div class="endpoint">GET /health - Health check</div>
+                <div class="endpoint">GET /health/live - Liveness probe</div>
+                <div class="endpoint">GET /health/ready - Readiness probe</div>
                 <div class="endpoint">GET /metrics - Prometheus metrics</div>
             </div>
         </div>
@@ -67,125 +169,179 @@ def main():
     </html>
     '''
 
-@app.route("/api/fetch", methods=["GET", "POST"])
+@bp.route("/api/fetch", methods=["GET", "POST"])
 @REQUEST_TIME.time()
 def fetch_data():
     """Fetch new beer data from PunkAPI"""
-    FETCH_COUNTER.inc()
+    def fetch():
+        FETCH_COUNTER.inc()
+        return get_service().fetch_beer_data()
     
-    result = beer_service.fetch_beer_data()
+    result = admit('fetch', fetch, collapse=True)
     
     if result['success']:
-        return jsonify({
+        return render({
             'status': 'success',
             'message': result['message'],
             'count': result['count']
         })
     else:
-        return jsonify({
+        return render({
             'status': 'error',
             'message': result['message']
         }), 500
 
-@app.route("/api/beers", methods=["GET"])
+@bp.route("/api/beers", methods=["GET"])
 @REQUEST_TIME.time()
 def get_all_beers():
     """Get all beers from database"""
     try:
-        beers = beer_service.get_all_beers()
-        return jsonify({
+        beers = wrap_raw_fields(admit('beers', get_service().get_all_beers), RAW_JSON_FIELDS)
+        return render({
             'status': 'success',
             'count': len(beers),
             'beers': beers
         })
+    except AdmissionRejected:
+        raise
     except Exception as e:
-        return jsonify({
+        return render({
             'status': 'error',
             'message': str(e)
         }), 500
 
-@app.route("/api/beers/<int:beer_id>", methods=["GET"])
+@bp.route("/api/beers/<int:beer_id>", methods=["GET"])
 @REQUEST_TIME.time()
 def get_beer_by_id(beer_id):
     """Get a specific beer by ID"""
     try:
-        beer = beer_service.get_beer_by_id(beer_id)
+        beer = get_service().get_beer_by_id(beer_id)
         if beer:
-            return jsonify({
+            wrap_raw_fields([beer], RAW_JSON_FIELDS)
+            return render({
                 'status': 'success',
                 'beer': beer
             })
         else:
-            return jsonify({
+            return render({
                 'status': 'error',
                 'message': 'Beer not found'
             }), 404
     except Exception as e:
-        return jsonify({
+        return render({
             'status': 'error',
             'message': str(e)
         }), 500
 
-@app.route("/api/analyze", methods=["GET"])
+@bp.route("/api/analyze", methods=["GET"])
 @REQUEST_TIME.time()
 def run_analysis():
     """Run data analysis on beer collection"""
-    ANALYSIS_COUNTER.inc()
+    def analyze():
+        ANALYSIS_COUNTER.inc()
+        return get_service().run_analysis()
     
-    result = beer_service.run_analysis()
+    result = admit('analyze', analyze, collapse=True)
     
     if result['success']:
-        return jsonify({
+        return render({
             'status': 'success',
             'analysis': result['analysis']
         })
     else:
-        return jsonify({
+        return render({
             'status': 'error',
             'message': result['message']
         }), 500
 
-@app.route("/api/stats", methods=["GET"])
+@bp.route("/api/stats", methods=["GET"])
 @REQUEST_TIME.time()
 def get_statistics():
     """Get summary statistics"""
-    result = beer_service.get_statistics()
+    result = admit('stats', get_service().get_statistics)
     
     if result['success']:
-        return jsonify({
+        wrap_raw_fields(result['statistics']['database']['latest_beers'], RAW_JSON_FIELDS)
+        return render({
             'status': 'success',
             'statistics': result['statistics']
         })
     else:
-        return jsonify({
+        return render({
             'status': 'error',
             'message': result['message']
         }), 500
 
-@app.route("/health", methods=["GET"])
+@bp.route("/api/trends", methods=["GET"])
+@REQUEST_TIME.time()
+def get_trends():
+    """Get time-bucketed trends over fetch history"""
+    result = get_service().get_trends(
+        request.args.get('granularity', 'day'),
+        request.args.get('start'),
+        request.args.get('end')
+    )
+    
+    if result['success']:
+        return render({
+            'status': 'success',
+            'trends': result['trends']
+        })
+    else:
+        return render({
+            'status': 'error',
+            'message': result['message']
+        }), result['status_code']
+
+@bp.route("/health", methods=["GET"])
 @REQUEST_TIME.time()
 def health_check():
     """Health check endpoint"""
-    result = beer_service.health_check()
+    result = get_service().health_check()
     
     if result['success']:
-        return jsonify({
+        return render({
             'status': result['status'],
             'service': result['service'],
             'database': result['database']
         })
     else:
-        return jsonify({
+        return render({
             'status': result['status'],
             'service': result['service'],
             'error': result['error']
         }), 500
 
-@app.route("/metrics", methods=["GET"])
+@bp.route("/health/live", methods=["GET"])
+def liveness_probe():
+    """Liveness probe endpoint"""
+    result = get_service().liveness()
+    
+    return render({
+        'status': result['status'],
+        'service': result['service']
+    })
+
+@bp.route("/health/ready", methods=["GET"])
+def readiness_probe():
+    """Readiness probe endpoint"""
+    result = get_service().readiness()
+    
+    response = render({
+        'status': result['status'],
+        'service': result['service'],
+        'checks': result['checks']
+    })
+    return response, 200 if result['success'] else 503
+
+@bp.route("/metrics", methods=["GET"])
 @REQUEST_TIME.time()
 def get_metrics():
-    """Prometheus metrics endpoint"""
-    return generate_latest()
+    """Prometheus metrics endpoint, aggregated across workers in multi-process mode"""
+    return Response(generate_latest(current_app.extensions['metrics_registry']),
+                    mimetype=CONTENT_TYPE_LATEST)
+
+app = create_app()
 
 if __name__ == "__main__":
     app.run(host='0.0.0.0', port=5001, debug=True)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Command-line batch tool for offline ingest, analysis and export
+
+Works directly on DatabaseManager and BeerAnalyzer without the web stack.
+
+Usage:
+    python src/cli.py ingest data/ extra.ndjson
+    python src/cli.py analyze --workers 4
+    python src/cli.py export --format csv --output beers.csv
+    python src/cli.py bench --rows 100000
+"""
+import os
+import sys
+import io
+import csv
+import json
+import time
+import argparse
+import tempfile
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Iterator, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database.db_manager import DatabaseManager
+from data_analyzer.analyzer import BeerAnalyzer
+from api.serializers import get_json_serializer, wrap_raw_fields
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+EXPORT_FIELDS = ['id', 'name', 'tagline', 'abv', 'ibu', 'description', 'ingredients', 'created_at']
+
+
+class Progress:
+    """Report row throughput to stderr at most once per interval"""
+
+    def __init__(self, label: str, enabled: bool = True, interval: float = 1.0, stream=None):
+        self.label = label
+        self.enabled = enabled
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.rows = 0
+        self.start = time.perf_counter()
+        self._last_report = self.start
+
+    def update(self, rows: int):
+        """Add processed rows and report if the interval has passed"""
+        self.rows += rows
+        now = time.perf_counter()
+        if self.enabled and now - self._last_report >= self.interval:
+            self._last_report = now
+            rate = self.rows / (now - self.start)
+            print(f"{self.label}: {self.rows} rows ({rate:,.0f} rows/s)", file=self.stream)
+
+    def finish(self) -> Dict[str, Any]:
+        """Report and return final throughput stats"""
+        seconds = time.perf_counter() - self.start
+        stats = {
+            'rows': self.rows,
+            'seconds': round(seconds, 3),
+            'rows_per_sec': round(self.rows / seconds, 1) if seconds > 0 else 0.0
+        }
+        if self.enabled:
+            print(f"{self.label}: {stats['rows']} rows in {stats['seconds']}s "
+                  f"({stats['rows_per_sec']:,.0f} rows/s)", file=self.stream)
+        return stats
+
+
+def iter_input_files(paths: Iterable[str]) -> Iterator[str]:
+    """Expand directories into the page and NDJSON files they contain"""
+    for path in paths:
+        if os.path.isdir(path):
+            for filename in sorted(os.listdir(path)):
+                if filename.endswith(('.json', '.ndjson', '.jsonl')):
+                    yield os.path.join(path, filename)
+        else:
+            yield path
+
+
+def read_beers(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream beers from a JSON page file or an NDJSON file"""
+    if path.endswith(('.ndjson', '.jsonl')):
+        with open(path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield json_loads(line)
+    else:
+        with open(path, 'rb') as f:
+            yield from json_loads(f.read()) or []
+
+
+def ingest(db: DatabaseManager, paths: List[str], batch_size: int = 5000,
+           show_progress: bool = True, observed_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """Bulk-load page files or NDJSON into the database as one fetch run"""
+    progress = Progress('ingest', show_progress)
+
+    def beers():
+        for path in iter_input_files(paths):
+            yield from read_beers(path)
+
+    db.save_beers_bulk(beers(), batch_size, progress.update, source='cli', observed_at=observed_at)
+    return progress.finish()
+
+
+def summarize_stream(beers: Iterable[Dict[str, Any]], progress: Progress) -> Dict[str, Any]:
+    """
+    Fold the analyzer's summary stats over a stream in constant memory
+
+    Produces the same shape as BeerAnalyzer.get_summary_stats and reports
+    progress as rows are consumed.
+    """
+    total = 0
+    abv_count, abv_sum = 0, 0.0
+    abv_min = abv_max = None
+    hop_counter = Counter()
+
+    for beer in beers:
+        total += 1
+        abv = beer.get('abv')
+        if abv:
+            abv_count += 1
+            abv_sum += abv
+            abv_min = abv if abv_min is None else min(abv_min, abv)
+            abv_max = abv if abv_max is None else max(abv_max, abv)
+        for hop in (beer.get('ingredients') or {}).get('hops') or []:
+            hop_name = hop.get('name', '').strip()
+            if hop_name:
+                hop_counter[hop_name] += 1
+        progress.update(1)
+
+    abv_stats = {}
+    if abv_count:
+        abv_stats = {'average': abv_sum / abv_count, 'min': abv_min, 'max': abv_max, 'count': abv_count}
+    return {
+        'total_beers': total,
+        'abv_stats': abv_stats,
+        'top_hops': dict(hop_counter.most_common(10))
+    }
+
+
+def analyze(data_dir: str, workers: int = 1, db: Optional[DatabaseManager] = None,
+            show_progress: bool = True) -> Dict[str, Any]:
+    """
+    Run the analyzer over raw page files, or over the database when db is given
+
+    The database is streamed through summarize_stream, so memory stays flat
+    regardless of catalog size.
+    """
+    progress = Progress('analyze', show_progress)
+
+    if db is not None:
+        def beers():
+            for beer in db.iter_beers():
+                beer['ingredients'] = json_loads(beer['ingredients']) if beer['ingredients'] else {}
+                yield beer
+
+        stats = summarize_stream(beers(), progress)
+    else:
+        analyzer = BeerAnalyzer(data_dir)
+        beers = analyzer.load_data(workers)
+        stats = analyzer.get_summary_stats(beers)
+        progress.update(len(beers))
+
+    progress.finish()
+    return stats
+
+
+def export(db: DatabaseManager, output, fmt: str = 'ndjson', batch_size: int = 5000,
+           show_progress: bool = True) -> Dict[str, Any]:
+    """
+    Stream the catalog to a binary file object as NDJSON or CSV
+
+    NDJSON rows carry the stored ingredients JSON verbatim.
+    """
+    progress = Progress('export', show_progress)
+    rows = db.iter_beers(batch_size)
+
+    if fmt == 'ndjson':
+        serializer = get_json_serializer()
+        for row in rows:
+            wrap_raw_fields([row], ('ingredients',))
+            output.write(serializer.dumps(row) + b'\n')
+            progress.update(1)
+    elif fmt == 'csv':
+        text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+        writer = csv.DictWriter(text, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            progress.update(1)
+        text.flush()
+        text.detach()
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    return progress.finish()
+
+
+def synthetic_beers(count: int) -> Iterator[Dict[str, Any]]:
+    """Generate beers shaped like PunkAPI records"""
+    for i in range(1, count + 1):
+        yield {
+            'id': i,
+            'name': f'Beer {i}',
+            'tagline': 'A Real Bitter Experience.',
+            'abv': 4.0 + i % 80 / 10,
+            'ibu': 20.0 + i % 100,
+            'description': 'A light, crisp and bitter IPA brewed with English and American hops.',
+            'ingredients': {
+                'malt': [{'name': 'Maris Otter Extra Pale', 'amount': {'value': 3.3, 'unit': 'kilograms'}}],
+                'hops': [{'name': f'Hop {i % 25}', 'amount': {'value': 25, 'unit': 'grams'},
+                          'add': 'start', 'attribute': 'bitter'}],
+                'yeast': 'Wyeast 1056 - American Ale'
+            }
+        }
+
+
+def bench(rows: int, workers: int = 1, batch_size: int = 5000) -> Dict[str, Any]:
+    """Measure ingest, export and analysis throughput on synthetic data"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = os.path.join(tmp_dir, 'data')
+        os.makedirs(data_dir)
+        ndjson_path = os.path.join(tmp_dir, 'beers.ndjson')
+        with open(ndjson_path, 'wb') as f:
+            for beer in synthetic_beers(rows):
+                f.write(json.dumps(beer).encode('utf-8') + b'\n')
+
+        per_page = 80
+        page, batch = 1, []
+        for beer in synthetic_beers(rows):
+            batch.append(beer)
+            if len(batch) == per_page:
+                with open(os.path.join(data_dir, f'raw_data_page={page}.json'), 'w') as f:
+                    json.dump(batch, f)
+                page, batch = page + 1, []
+        if batch:
+            with open(os.path.join(data_dir, f'raw_data_page={page}.json'), 'w') as f:
+                json.dump(batch, f)
+
+        db = DatabaseManager(os.path.join(tmp_dir, 'bench.db'))
+        results['ingest'] = ingest(db, [ndjson_path], batch_size, show_progress=False)
+        with open(os.devnull, 'wb') as devnull:
+            results['export_ndjson'] = export(db, devnull, 'ndjson', batch_size, show_progress=False)
+            results['export_csv'] = export(db, devnull, 'csv', batch_size, show_progress=False)
+
+        start = time.perf_counter()
+        BeerAnalyzer(data_dir).get_summary_stats(workers=workers)
+        seconds = time.perf_counter() - start
+        results['analyze'] = {
+            'rows': rows,
+            'seconds': round(seconds, 3),
+            'rows_per_sec': round(rows / seconds, 1) if seconds > 0 else 0.0
+        }
+    return results
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser"""
+    parser = argparse.ArgumentParser(prog='beerdb', description='BeerDB batch tool')
+    parser.add_argument('--db', default='beer_data.db', help='SQLite database path')
+    parser.add_argument('--data-dir', default='data', help='Raw page file directory')
+    parser.add_argument('--quiet', action='store_true', help='Disable progress reporting')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = subparsers.add_parser('ingest', help='Bulk-load page files or NDJSON')
+    ingest_parser.add_argument('paths', nargs='+', help='Files or directories to load')
+    ingest_parser.add_argument('--batch-size', type=int, default=5000)
+    ingest_parser.add_argument('--observed-at', type=datetime.fromisoformat,
+                               help='ISO timestamp to record the run under, for backfills')
+
+    analyze_parser = subparsers.add_parser('analyze', help='Run the analyzer')
+    analyze_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                                help='Processes used to parse page files')
+    analyze_parser.add_argument('--source', choices=['files', 'db'], default='files')
+
+    export_parser = subparsers.add_parser('export', help='Stream the catalog to a file')
+    export_parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+    export_parser.add_argument('--output', default='-', help="Output path, '-' for stdout")
+    export_parser.add_argument('--batch-size', type=int, default=5000)
+
+    bench_parser = subparsers.add_parser('bench', help='Measure throughput on synthetic data')
+    bench_parser.add_argument('--rows', type=int, default=100000)
+    bench_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    bench_parser.add_argument('--batch-size', type=int, default=5000)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    show_progress = not args.quiet
+
+    if args.command == 'ingest':
+        db = DatabaseManager(args.db)
+        ingest(db, args.paths, args.batch_size, show_progress, args.observed_at)
+    elif args.command == 'analyze':
+        db = DatabaseManager(args.db) if args.source == 'db' else None
+        stats = analyze(args.data_dir, args.workers, db, show_progress)
+        print(json.dumps(stats, indent=2))
+    elif args.command == 'export':
+        db = DatabaseManager(args.db)
+        if args.output == '-':
+            export(db, sys.stdout.buffer, args.format, args.batch_size, show_progress)
+            sys.stdout.buffer.flush()
+        else:
+            with open(args.output, 'wb') as output:
+                export(db, output, args.format, args.batch_size, show_progress)
+    elif args.command == 'bench':
+        results = bench(args.rows, args.workers, args.batch_size)
+        print(f"{'operation':<16}{'rows':>10}{'seconds':>10}{'rows/s':>14}")
+        for name, stats in results.items():
+            print(f"{name:<16}{stats['rows']:>10}{stats['seconds']:>10.3f}{stats['rows_per_sec']:>14,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
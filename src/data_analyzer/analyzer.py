@@ -1,28 +1,67 @@
 import json
 import os
-from typing import Dict, List, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
 from collections import Counter
 
+
+def _load_file(path: str) -> List[Dict[str, Any]]:
+    """Parse one JSON page file"""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
 class BeerAnalyzer:
     def __init__(self, data_dir: str = 'data'):
         self.data_dir = data_dir
+        # (files signature, beers), swapped as one reference so concurrent
+        # readers never pair a signature with another load's beers
+        self._cache_state: Optional[Tuple[Tuple, List[Dict[str, Any]]]] = None
+    
+    def _files_signature(self) -> Tuple:
+        """Name, size and mtime of every JSON file in the data directory"""
+        with os.scandir(self.data_dir) as entries:
+            return tuple(sorted(
+                (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+                for entry in entries if entry.name.endswith('.json')
+            ))
     
-    def load_data(self) -> List[Dict[str, Any]]:
-        """Load all beer data from JSON files"""
+    def load_data(self, workers: int = 1) -> List[Dict[str, Any]]:
+        """
+        Load all beer data from JSON files, reusing the last load if no file changed
+        
+        Args:
+            workers: Number of processes used to parse files in parallel
+            
+        Returns:
+            List of beer dicts from all files
+        """
         all_beers = []
         if not os.path.exists(self.data_dir):
             return all_beers
+        
+        signature = self._files_signature()
+        cache_state = self._cache_state
+        if cache_state is not None and cache_state[0] == signature:
+            return list(cache_state[1])
             
-        for filename in os.listdir(self.data_dir):
-            if filename.endswith('.json'):
-                with open(os.path.join(self.data_dir, filename), 'r') as f:
-                    beers = json.load(f)
+        paths = [os.path.join(self.data_dir, filename) for filename, _, _ in signature]
+        if workers > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunksize = max(1, len(paths) // (workers * 4))
+                for beers in executor.map(_load_file, paths, chunksize=chunksize):
                     all_beers.extend(beers)
-        return all_beers
+        else:
+            for path in paths:
+                all_beers.extend(_load_file(path))
+        
+        self._cache_state = (signature, all_beers)
+        return list(all_beers)
     
-    def analyze_abv_distribution(self) -> Dict[str, float]:
+    def analyze_abv_distribution(self, beers: Optional[List[Dict[str, Any]]] = None) -> Dict[str, float]:
         """Analyze alcohol by volume distribution"""
-        beers = self.load_data()
+        if beers is None:
+            beers = self.load_data()
         abv_values = [beer.get('abv', 0) for beer in beers if beer.get('abv')]
         
         if not abv_values:
@@ -35,13 +74,14 @@ class BeerAnalyzer:
             'count': len(abv_values)
         }
     
-    def analyze_hops_popularity(self) -> Dict[str, int]:
+    def analyze_hops_popularity(self, beers: Optional[List[Dict[str, Any]]] = None) -> Dict[str, int]:
         """Analyze most popular hops used"""
-        beers = self.load_data()
+        if beers is None:
+            beers = self.load_data()
         hop_counter = Counter()
         
         for beer in beers:
-            hops = beer.get('ingredients', {}).get('hops', [])
+            hops = (beer.get('ingredients') or {}).get('hops') or []
             for hop in hops:
                 hop_name = hop.get('name', '').strip()
                 if hop_name:
@@ -49,11 +89,13 @@ class BeerAnalyzer:
                     
         return dict(hop_counter.most_common(10))
     
-    def get_summary_stats(self) -> Dict[str, Any]:
+    def get_summary_stats(self, beers: Optional[List[Dict[str, Any]]] = None,
+                          workers: int = 1) -> Dict[str, Any]:
         """Get overall summary statistics"""
-        beers = self.load_data()
+        if beers is None:
+            beers = self.load_data(workers)
         return {
             'total_beers': len(beers),
-            'abv_stats': self.analyze_abv_distribution(),
-            'top_hops': self.analyze_hops_popularity()
+            'abv_stats': self.analyze_abv_distribution(beers),
+            'top_hops': self.analyze_hops_popularity(beers)
         }
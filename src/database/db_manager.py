@@ -1,10 +1,20 @@
+import os
+import fcntl
 import sqlite3
 import json
-from typing import List, Dict, Any
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from urllib.parse import quote
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Iterator, Callable, Optional
+
+from . import trends
 
 class DatabaseManager:
     def __init__(self, db_path: str = 'beer_data.db'):
         self.db_path = db_path
+        self._run_lock = threading.Lock()
         if db_path == ':memory:':
             self._conn = sqlite3.connect(db_path)
             self.init_database()
@@ -35,6 +45,7 @@ class DatabaseManager:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
+            trends.init_schema(conn)
             conn.commit()
         else:
             with sqlite3.connect(self.db_path) as conn:
@@ -50,8 +61,28 @@ class DatabaseManager:
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     )
                 ''')
+                trends.init_schema(conn)
                 conn.commit()
     
+    @contextmanager
+    def run_lock(self):
+        """
+        Serialize fetch runs on this database
+        
+        File databases are locked with flock on a file next to the database,
+        so runs from other workers and the CLI wait their turn.
+        """
+        if self._conn:
+            with self._run_lock:
+                yield
+        else:
+            with open(f'{self.db_path}.lock', 'a') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+    
     def save_beer(self, beer_data: Dict[str, Any]):
         """Save a single beer to database"""
         if self._conn:
@@ -87,10 +118,73 @@ class DatabaseManager:
                 ))
                 conn.commit()
     
-    def save_beers_batch(self, beers: List[Dict[str, Any]]):
-        """Save multiple beers to database"""
-        for beer in beers:
-            self.save_beer(beer)
+    def save_beers_batch(self, beers: List[Dict[str, Any]], source: str = 'batch'):
+        """Save multiple beers to database as one fetch run"""
+        self.save_beers_bulk(beers, source=source)
+    
+    def save_beers_bulk(self, beers: Iterable[Dict[str, Any]], batch_size: int = 5000,
+                        progress: Optional[Callable[[int], None]] = None,
+                        source: str = 'batch', observed_at: Optional[datetime] = None) -> int:
+        """
+        Save a stream of beers using one connection and one transaction per batch
+        
+        The stream is recorded as one fetch run: new or changed beers are
+        written to beer_history in the same transaction as each batch, and
+        the trend rollups are updated once the run finishes, including when
+        the stream raises partway. Runs hold run_lock() throughout.
+        
+        Args:
+            beers: Iterable of beer dicts; consumed lazily
+            batch_size: Rows per executemany and commit
+            progress: Called with the row count of each committed batch
+            source: Label stored on the fetch run
+            observed_at: Timestamp of the run, defaults to now; set it to
+                backfill historical snapshots
+        
+        Returns:
+            Number of rows written
+        """
+        conn = self._conn or sqlite3.connect(self.db_path)
+        try:
+            if conn is not self._conn:
+                conn.execute('PRAGMA synchronous = NORMAL')
+            with self.run_lock():
+                with conn:
+                    run_id, observed_at = trends.start_run(conn, source, observed_at)
+                total = 0
+                try:
+                    iterator = iter(beers)
+                    while True:
+                        batch = list(islice(iterator, batch_size))
+                        if not batch:
+                            break
+                        rows = [(
+                            beer_data.get('id'),
+                            beer_data.get('name'),
+                            beer_data.get('tagline'),
+                            beer_data.get('abv'),
+                            beer_data.get('ibu'),
+                            beer_data.get('description'),
+                            json.dumps(beer_data.get('ingredients', {}))
+                        ) for beer_data in batch]
+                        with conn:
+                            trends.record_changes(conn, run_id, observed_at, rows)
+                            conn.executemany('''
+                                INSERT OR REPLACE INTO beers
+                                (id, name, tagline, abv, ibu, description, ingredients)
+                                VALUES (?, ?, ?, ?, ?, ?, ?)
+                            ''', rows)
+                        total += len(batch)
+                        if progress:
+                            progress(len(batch))
+                finally:
+                    # Fold the committed batches even if the stream failed partway
+                    with conn:
+                        trends.finish_run(conn, run_id, observed_at, total)
+            return total
+        finally:
+            if conn is not self._conn:
+                conn.close()
     
     def get_all_beers(self) -> List[Dict[str, Any]]:
         """Retrieve all beers from database"""
@@ -120,6 +214,77 @@ class DatabaseManager:
                 row = cursor.fetchone()
                 return dict(row) if row else {}
     
+    def iter_beers(self, batch_size: int = 5000) -> Iterator[Dict[str, Any]]:
+        """Stream all beers ordered by ID without loading the table into memory"""
+        conn = self._conn or sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute('SELECT * FROM beers ORDER BY id')
+            columns = [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            if conn is not self._conn:
+                conn.close()
+    
+    def count_beers(self) -> int:
+        """Count beers in database"""
+        if self._conn:
+            return self._conn.execute('SELECT COUNT(*) FROM beers').fetchone()[0]
+        else:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                return conn.execute('SELECT COUNT(*) FROM beers').fetchone()[0]
+            finally:
+                conn.close()
+    
+    def get_trends(self, granularity: str = 'day', start: Optional[str] = None,
+                   end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Read time-bucketed trend rollups in [start, end)"""
+        if self._conn:
+            return trends.query_rollups(self._conn, granularity, start, end)
+        else:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                return trends.query_rollups(conn, granularity, start, end)
+            finally:
+                conn.close()
+    
+    def get_beer_history(self, beer_id: int) -> List[Dict[str, Any]]:
+        """Retrieve every recorded version of a beer, oldest first"""
+        if self._conn:
+            conn = self._conn
+            conn.row_factory = sqlite3.Row
+            cursor = conn.execute('SELECT * FROM beer_history WHERE beer_id = ? ORDER BY run_id', (beer_id,))
+            return [dict(row) for row in cursor.fetchall()]
+        else:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.execute('SELECT * FROM beer_history WHERE beer_id = ? ORDER BY run_id', (beer_id,))
+                return [dict(row) for row in cursor.fetchall()]
+    
+    def ping(self) -> bool:
+        """
+        Run a constant-cost query that reads the database header
+        
+        The file is opened read-write without being created, so a missing
+        or corrupt database raises sqlite3 errors instead of passing.
+        """
+        if self._conn:
+            self._conn.execute('PRAGMA schema_version').fetchone()
+            return True
+        else:
+            uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=rw"
+            conn = sqlite3.connect(uri, uri=True, timeout=1)
+            try:
+                conn.execute('PRAGMA schema_version').fetchone()
+                return True
+            finally:
+                conn.close()
+    
     def close(self):
         """Close the database connection"""
         if self._conn:
@@ -0,0 +1,374 @@
+"""
+Append-only beer history and incrementally maintained trend rollups
+
+Each ingest is recorded as a fetch run. Beers that are new or whose
+attributes changed get a history row keyed by (beer_id, run_id) holding
+their last version in the run. When the run finishes, its history rows
+are folded into the hour and day rollups for the run's timestamp, so
+range queries never scan raw history.
+"""
+import json
+import math
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+GRANULARITIES = {
+    'hour': '%Y-%m-%d %H:00:00',
+    'day': '%Y-%m-%d 00:00:00'
+}
+
+BEER_FIELDS = ('id', 'name', 'tagline', 'abv', 'ibu', 'description', 'ingredients')
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS fetch_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source TEXT NOT NULL,
+        started_at TIMESTAMP NOT NULL,
+        beer_count INTEGER DEFAULT 0,
+        finished INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS beer_history (
+        beer_id INTEGER NOT NULL,
+        run_id INTEGER NOT NULL REFERENCES fetch_runs(id),
+        recorded_at TIMESTAMP NOT NULL,
+        change TEXT NOT NULL,
+        name TEXT,
+        tagline TEXT,
+        abv REAL,
+        ibu REAL,
+        description TEXT,
+        ingredients TEXT,
+        PRIMARY KEY (beer_id, run_id)
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_beer_history_run ON beer_history (run_id)',
+    '''
+    CREATE TABLE IF NOT EXISTS trend_rollups (
+        granularity TEXT NOT NULL,
+        bucket_start TIMESTAMP NOT NULL,
+        beers_added INTEGER DEFAULT 0,
+        beers_changed INTEGER DEFAULT 0,
+        abv_count INTEGER DEFAULT 0,
+        abv_sum REAL DEFAULT 0,
+        abv_sum_sq REAL DEFAULT 0,
+        abv_min REAL,
+        abv_max REAL,
+        ibu_count INTEGER DEFAULT 0,
+        ibu_sum REAL DEFAULT 0,
+        ibu_sum_sq REAL DEFAULT 0,
+        ibu_min REAL,
+        ibu_max REAL,
+        PRIMARY KEY (granularity, bucket_start)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS trend_hop_rollups (
+        granularity TEXT NOT NULL,
+        bucket_start TIMESTAMP NOT NULL,
+        hop TEXT NOT NULL,
+        count INTEGER DEFAULT 0,
+        PRIMARY KEY (granularity, bucket_start, hop)
+    )
+    '''
+]
+
+# SQLite's default host parameter limit is 999 on older builds
+LOOKUP_CHUNK = 500
+
+
+# Version of each beer from before the current run, for beers the run
+# changed; per connection, so it never outlives the run's connection
+BASELINE_SCHEMA = f'''
+    CREATE TEMP TABLE IF NOT EXISTS run_baseline (
+        run_id INTEGER NOT NULL,
+        {', '.join(BEER_FIELDS)},
+        PRIMARY KEY (run_id, id)
+    )
+'''
+
+
+def init_schema(conn):
+    """Create history and rollup tables"""
+    for statement in SCHEMA:
+        conn.execute(statement)
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(fetch_runs)')]
+    if 'finished' not in columns:
+        # Runs recorded before the flag existed were already folded
+        conn.execute('ALTER TABLE fetch_runs ADD COLUMN finished INTEGER NOT NULL DEFAULT 1')
+
+
+def _utc(moment: datetime) -> datetime:
+    """Naive UTC datetime; naive input is assumed to be UTC already"""
+    if moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def format_timestamp(moment: datetime) -> str:
+    """Format a datetime like SQLite's CURRENT_TIMESTAMP (UTC)"""
+    return _utc(moment).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def normalize_bound(value: Optional[str]) -> Optional[str]:
+    """Parse an ISO date or datetime query bound into stored timestamp format"""
+    if not value:
+        return None
+    try:
+        return format_timestamp(datetime.fromisoformat(value))
+    except ValueError:
+        raise ValueError(f"Invalid timestamp: {value!r}")
+
+
+def start_run(conn, source: str, observed_at: Optional[datetime] = None) -> Tuple[int, datetime]:
+    """
+    Insert a fetch run and return its ID and timestamp
+
+    Runs left unfinished by an interrupted ingest are folded into the
+    rollups first, since their history rows were already committed.
+    Callers must not have another run in progress on the same database.
+    """
+    unfinished = conn.execute('SELECT id, started_at FROM fetch_runs WHERE finished = 0').fetchall()
+    for run_id, started_at in unfinished:
+        count = conn.execute('SELECT COUNT(*) FROM beer_history WHERE run_id = ?', (run_id,)).fetchone()[0]
+        finish_run(conn, run_id, datetime.strptime(started_at, '%Y-%m-%d %H:%M:%S'), count)
+
+    observed_at = observed_at or datetime.now(timezone.utc)
+    cursor = conn.execute(
+        'INSERT INTO fetch_runs (source, started_at, finished) VALUES (?, ?, 0)',
+        (source, format_timestamp(observed_at))
+    )
+    return cursor.lastrowid, observed_at
+
+
+def finish_run(conn, run_id: int, observed_at: datetime, beer_count: int):
+    """Record how many beers a run ingested and fold its history into the rollups"""
+    cursor = conn.execute('UPDATE fetch_runs SET beer_count = ?, finished = 1 WHERE id = ? AND finished = 0',
+                          (beer_count, run_id))
+    if cursor.rowcount:
+        update_rollups(conn, run_id, observed_at)
+    conn.execute(BASELINE_SCHEMA)
+    conn.execute('DELETE FROM run_baseline WHERE run_id = ?', (run_id,))
+
+
+def _rows_by_id(conn, query: str, ids: Sequence[Any], params: Sequence[Any] = ()) -> Dict[Any, tuple]:
+    """Run query, whose last placeholder is an ID list, and key rows by their first column"""
+    found = {}
+    for i in range(0, len(ids), LOOKUP_CHUNK):
+        chunk = ids[i:i + LOOKUP_CHUNK]
+        placeholders = ','.join('?' * len(chunk))
+        for row in conn.execute(query.format(ids=placeholders), list(params) + list(chunk)):
+            found[row[0]] = tuple(row)
+    return found
+
+
+def _current_rows(conn, ids: Sequence[Any]) -> Dict[Any, tuple]:
+    """Current stored attributes for the given beer IDs"""
+    return _rows_by_id(conn, f"SELECT {', '.join(BEER_FIELDS)} FROM beers WHERE id IN ({{ids}})", ids)
+
+
+def _hop_names(ingredients: Optional[str]) -> List[str]:
+    """Hop names from a beer's JSON-encoded ingredients"""
+    try:
+        ingredients = json.loads(ingredients) if ingredients else {}
+    except ValueError:
+        return []
+    if not isinstance(ingredients, dict):
+        return []
+    names = []
+    for hop in ingredients.get('hops') or []:
+        name = (hop.get('name') or '').strip() if isinstance(hop, dict) else ''
+        if name:
+            names.append(name)
+    return names
+
+
+def record_changes(conn, run_id: int, observed_at: datetime, rows: List[tuple]):
+    """
+    Upsert history for new or changed beers
+
+    Must be called before the rows are written to the beers table. A beer
+    seen again later in the same run keeps one history row holding its
+    last version, and keeps the change label from its first appearance.
+    If its last version matches the one from before the run, the history
+    row is dropped again.
+
+    Args:
+        conn: Connection inside the caller's transaction
+        run_id: Fetch run the rows belong to
+        observed_at: Timestamp of the run
+        rows: Beer tuples ordered like BEER_FIELDS, ingredients JSON-encoded
+    """
+    latest = {}
+    for row in rows:
+        if row[0] is not None:
+            beer_id = int(row[0])
+            latest[beer_id] = (beer_id,) + tuple(row[1:])
+    ids = list(latest)
+    current = _current_rows(conn, ids)
+    in_run = _rows_by_id(conn, 'SELECT beer_id, change FROM beer_history WHERE run_id = ? AND beer_id IN ({ids})',
+                         ids, (run_id,))
+    conn.execute(BASELINE_SCHEMA)
+    baseline = _rows_by_id(conn, f"SELECT {', '.join(BEER_FIELDS)} FROM run_baseline "
+                                 "WHERE run_id = ? AND id IN ({ids})", list(in_run), (run_id,))
+    recorded_at = format_timestamp(observed_at)
+
+    history, reverted, previous_versions = [], [], []
+    for beer_id, row in latest.items():
+        if beer_id in in_run:
+            if baseline.get(beer_id) == row:
+                reverted.append((beer_id, run_id))
+            else:
+                history.append((beer_id, run_id, recorded_at, in_run[beer_id][1]) + row[1:])
+            continue
+        previous = current.get(beer_id)
+        if previous == row:
+            continue
+        if previous is not None:
+            previous_versions.append((run_id,) + previous)
+        change = 'added' if previous is None else 'changed'
+        history.append((beer_id, run_id, recorded_at, change) + row[1:])
+
+    conn.executemany(f"INSERT OR REPLACE INTO run_baseline (run_id, {', '.join(BEER_FIELDS)}) "
+                     f"VALUES ({', '.join('?' * (len(BEER_FIELDS) + 1))})", previous_versions)
+    conn.executemany('DELETE FROM beer_history WHERE beer_id = ? AND run_id = ?', reverted)
+    conn.executemany('''
+        INSERT INTO beer_history
+        (beer_id, run_id, recorded_at, change, name, tagline, abv, ibu, description, ingredients)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (beer_id, run_id) DO UPDATE SET
+            recorded_at = excluded.recorded_at,
+            name = excluded.name,
+            tagline = excluded.tagline,
+            abv = excluded.abv,
+            ibu = excluded.ibu,
+            description = excluded.description,
+            ingredients = excluded.ingredients
+    ''', history)
+
+
+def update_rollups(conn, run_id: int, observed_at: datetime):
+    """
+    Add one finished run to the hour and day rollups
+
+    Aggregates the run's history rows, so each beer is counted once per
+    run with its final version no matter how many batches it arrived in.
+    """
+    cursor = conn.execute('''
+        SELECT SUM(change = 'added'), SUM(change = 'changed'),
+               COUNT(abv), TOTAL(abv), TOTAL(abv * abv), MIN(abv), MAX(abv),
+               COUNT(ibu), TOTAL(ibu), TOTAL(ibu * ibu), MIN(ibu), MAX(ibu)
+        FROM beer_history WHERE run_id = ?
+    ''', (run_id,))
+    added, changed, *moments = cursor.fetchone()
+    if not added and not changed:
+        return
+
+    hops = Counter()
+    for (ingredients,) in conn.execute('SELECT ingredients FROM beer_history WHERE run_id = ?', (run_id,)):
+        hops.update(_hop_names(ingredients))
+
+    for granularity, bucket_format in GRANULARITIES.items():
+        bucket_start = _utc(observed_at).strftime(bucket_format)
+        conn.execute('''
+            INSERT INTO trend_rollups
+            (granularity, bucket_start, beers_added, beers_changed,
+             abv_count, abv_sum, abv_sum_sq, abv_min, abv_max,
+             ibu_count, ibu_sum, ibu_sum_sq, ibu_min, ibu_max)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (granularity, bucket_start) DO UPDATE SET
+                beers_added = beers_added + excluded.beers_added,
+                beers_changed = beers_changed + excluded.beers_changed,
+                abv_count = abv_count + excluded.abv_count,
+                abv_sum = abv_sum + excluded.abv_sum,
+                abv_sum_sq = abv_sum_sq + excluded.abv_sum_sq,
+                abv_min = MIN(COALESCE(abv_min, excluded.abv_min), COALESCE(excluded.abv_min, abv_min)),
+                abv_max = MAX(COALESCE(abv_max, excluded.abv_max), COALESCE(excluded.abv_max, abv_max)),
+                ibu_count = ibu_count + excluded.ibu_count,
+                ibu_sum = ibu_sum + excluded.ibu_sum,
+                ibu_sum_sq = ibu_sum_sq + excluded.ibu_sum_sq,
+                ibu_min = MIN(COALESCE(ibu_min, excluded.ibu_min), COALESCE(excluded.ibu_min, ibu_min)),
+                ibu_max = MAX(COALESCE(ibu_max, excluded.ibu_max), COALESCE(excluded.ibu_max, ibu_max))
+        ''', (granularity, bucket_start, added, changed, *moments))
+        conn.executemany('''
+            INSERT INTO trend_hop_rollups (granularity, bucket_start, hop, count)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (granularity, bucket_start, hop) DO UPDATE SET
+                count = count + excluded.count
+        ''', [(granularity, bucket_start, hop, count) for hop, count in hops.items()])
+
+
+def _distribution(count: int, total: float, total_sq: float,
+                  minimum: Optional[float], maximum: Optional[float]) -> Dict[str, Any]:
+    """Summary of one attribute's distribution within a bucket"""
+    if not count:
+        return {'count': 0}
+    mean = total / count
+    variance = max(total_sq / count - mean * mean, 0.0)
+    return {
+        'count': count,
+        'mean': mean,
+        'stddev': math.sqrt(variance),
+        'min': minimum,
+        'max': maximum
+    }
+
+
+def query_rollups(conn, granularity: str, start: Optional[str] = None,
+                  end: Optional[str] = None, top_hops: int = 10) -> List[Dict[str, Any]]:
+    """
+    Read pre-aggregated trend buckets in [start, end)
+
+    Args:
+        conn: Database connection
+        granularity: 'hour' or 'day'
+        start: Inclusive lower bound, ISO date or datetime
+        end: Exclusive upper bound, ISO date or datetime
+        top_hops: Number of hops reported per bucket
+
+    Returns:
+        List of buckets ordered by time
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+
+    start = normalize_bound(start)
+    end = normalize_bound(end)
+    where = 'granularity = ?'
+    params: List[Any] = [granularity]
+    if start:
+        where += ' AND bucket_start >= ?'
+        params.append(start)
+    if end:
+        where += ' AND bucket_start < ?'
+        params.append(end)
+
+    buckets = {}
+    cursor = conn.execute(f'''
+        SELECT bucket_start, beers_added, beers_changed,
+               abv_count, abv_sum, abv_sum_sq, abv_min, abv_max,
+               ibu_count, ibu_sum, ibu_sum_sq, ibu_min, ibu_max
+        FROM trend_rollups WHERE {where} ORDER BY bucket_start
+    ''', params)
+    for row in cursor:
+        buckets[row[0]] = {
+            'bucket_start': row[0],
+            'beers_added': row[1],
+            'beers_changed': row[2],
+            'abv': _distribution(*row[3:8]),
+            'ibu': _distribution(*row[8:13]),
+            'top_hops': Counter()
+        }
+
+    cursor = conn.execute(f'SELECT bucket_start, hop, count FROM trend_hop_rollups WHERE {where}', params)
+    for bucket_start, hop, count in cursor:
+        if bucket_start in buckets:
+            buckets[bucket_start]['top_hops'][hop] = count
+
+    for bucket in buckets.values():
+        bucket['top_hops'] = dict(bucket['top_hops'].most_common(top_hops))
+    return list(buckets.values())
+
@@ -26,6 +26,14 @@ class EventPublisher:
         }
         self.event_queue.put(event)
     
+    def queue_depth(self) -> int:
+        """Number of events waiting to be processed"""
+        return self.event_queue.qsize()
+    
+    def is_alive(self) -> bool:
+        """Whether the background worker thread is running"""
+        return self.worker_thread.is_alive()
+    
     def _process_events(self):
         """Process events in background thread"""
         while True:
@@ -0,0 +1,228 @@
+import unittest
+import sys
+import os
+import fcntl
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from src import app as app_module
+from src.app import create_app
+from api.admission import AdmissionController, AdmissionRejected, EndpointLimit, default_budget, default_limits
+from api.beer_service import BeerService
+
+
+class RecordingCounter:
+
+    def __init__(self):
+        self.counts = {}
+
+    def labels(self, endpoint, outcome):
+        counter = self
+
+        class Child:
+            def inc(self):
+                counter.counts[(endpoint, outcome)] = counter.counts.get((endpoint, outcome), 0) + 1
+        return Child()
+
+
+class TestAdmissionController(unittest.TestCase):
+
+    def test_sheds_with_429_when_queue_is_full(self):
+        limit = EndpointLimit(max_concurrent=1, max_queue=0)
+        controller = AdmissionController({'fetch': limit})
+        limit.acquire('fetch')
+
+        with self.assertRaises(AdmissionRejected) as ctx:
+            controller.run('fetch', lambda: 'ok')
+        self.assertEqual(ctx.exception.status_code, 429)
+
+    def test_sheds_with_503_when_queue_wait_exceeds_budget(self):
+        limit = EndpointLimit(max_concurrent=1, max_queue=1, queue_timeout=0.05, retry_after=2.5)
+        controller = AdmissionController({'analyze': limit})
+        limit.acquire('analyze')
+
+        with self.assertRaises(AdmissionRejected) as ctx:
+            controller.run('analyze', lambda: 'ok')
+        self.assertEqual(ctx.exception.status_code, 503)
+        self.assertEqual(ctx.exception.retry_after_header, '3')
+
+    def test_queued_request_runs_when_slot_frees(self):
+        limit = EndpointLimit(max_concurrent=1, max_queue=1, queue_timeout=5)
+        counter = RecordingCounter()
+        controller = AdmissionController({'stats': limit}, counter)
+        limit.acquire('stats')
+        threading.Timer(0.05, limit.release).start()
+
+        self.assertEqual(controller.run('stats', lambda: 'ok'), 'ok')
+        self.assertEqual(counter.counts, {('stats', 'queued'): 1})
+
+    def test_identical_calls_are_collapsed(self):
+        counter = RecordingCounter()
+        controller = AdmissionController({'fetch': EndpointLimit(max_concurrent=1, max_queue=3)}, counter)
+        calls = []
+        started = threading.Event()
+
+        def slow_fetch():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return {'count': len(calls)}
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(controller.run('fetch', slow_fetch, 'fetch')))
+        leader.start()
+        started.wait()
+        followers = [threading.Thread(target=lambda: results.append(controller.run('fetch', slow_fetch, 'fetch')))
+                     for _ in range(3)]
+        for thread in followers:
+            thread.start()
+        for thread in [leader] + followers:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'count': 1}] * 4)
+        self.assertEqual(counter.counts[('fetch', 'collapsed')], 3)
+
+    def test_collapsed_followers_count_against_queue_and_time_out(self):
+        limit = EndpointLimit(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+        counter = RecordingCounter()
+        controller = AdmissionController({'fetch': limit}, counter)
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow_fetch():
+            started.set()
+            release.wait(5)
+            return 'done'
+
+        leader = threading.Thread(target=controller.run, args=('fetch', slow_fetch, 'fetch'))
+        leader.start()
+        started.wait()
+        statuses = []
+
+        def follow():
+            try:
+                controller.run('fetch', slow_fetch, 'fetch')
+            except AdmissionRejected as e:
+                statuses.append(e.status_code)
+
+        followers = [threading.Thread(target=follow) for _ in range(2)]
+        for thread in followers:
+            thread.start()
+        for thread in followers:
+            thread.join()
+        release.set()
+        leader.join()
+
+        self.assertEqual(sorted(statuses), [429, 503])
+        self.assertEqual(counter.counts[('fetch', 'shed')], 2)
+        self.assertNotIn(('fetch', 'collapsed'), counter.counts)
+        self.assertEqual(limit.following, 0)
+
+    def test_followers_share_result_of_leader_slower_than_queue_timeout(self):
+        limit = EndpointLimit(max_concurrent=1, max_queue=2, queue_timeout=0.05, follow_timeout=5)
+        controller = AdmissionController({'fetch': limit}, budget=EndpointLimit(max_concurrent=3))
+        started = threading.Event()
+
+        def slow_fetch():
+            started.set()
+            time.sleep(0.3)
+            return 'shared'
+
+        results = []
+        run = lambda: results.append(controller.run('fetch', slow_fetch, 'fetch'))
+        leader = threading.Thread(target=run)
+        leader.start()
+        started.wait()
+        followers = [threading.Thread(target=run) for _ in range(2)]
+        for thread in followers:
+            thread.start()
+        for thread in [leader] + followers:
+            thread.join()
+
+        self.assertEqual(results, ['shared'] * 3)
+
+    def test_budget_rejection_uses_endpoint_retry_after(self):
+        budget = EndpointLimit(max_concurrent=1, retry_after=1.0)
+        controller = AdmissionController({'fetch': EndpointLimit(1, 2, retry_after=30.0)}, budget=budget)
+        budget.acquire('stats')
+
+        with self.assertRaises(AdmissionRejected) as ctx:
+            controller.run('fetch', lambda: 'ok', 'fetch')
+        self.assertEqual(ctx.exception.retry_after_header, '30')
+
+    def test_budget_sheds_when_limited_endpoints_hold_all_threads(self):
+        budget = EndpointLimit(max_concurrent=1)
+        controller = AdmissionController({'stats': EndpointLimit(4, 4), 'beers': EndpointLimit(4, 4)},
+                                         budget=budget)
+        budget.acquire('stats')
+
+        with self.assertRaises(AdmissionRejected) as ctx:
+            controller.run('beers', lambda: 'ok')
+        self.assertEqual(ctx.exception.status_code, 429)
+        self.assertEqual(controller.run('health', lambda: 'ok'), 'ok')
+        budget.release()
+        self.assertEqual(controller.run('beers', lambda: 'ok'), 'ok')
+        self.assertEqual(budget.active, 0)
+
+    def test_default_limits_fit_thread_budget(self):
+        for threads in (2, 4, 8, 16):
+            budget = default_budget(threads)
+            self.assertLess(budget.max_concurrent, threads)
+            for limit in default_limits(threads).values():
+                self.assertLessEqual(limit.max_concurrent + limit.max_queue, budget.max_concurrent)
+
+    def test_process_lock_sheds_while_another_worker_holds_it(self):
+        lock_path = os.path.join(tempfile.mkdtemp(), 'beer_data.db.fetch.lock')
+        counter = RecordingCounter()
+        controller = AdmissionController({'fetch': EndpointLimit(1, retry_after=30.0)}, counter,
+                                         process_locks={'fetch': lock_path})
+
+        with open(lock_path, 'a') as other_worker:
+            fcntl.flock(other_worker, fcntl.LOCK_EX)
+            with self.assertRaises(AdmissionRejected) as ctx:
+                controller.run('fetch', lambda: 'ok', 'fetch')
+            fcntl.flock(other_worker, fcntl.LOCK_UN)
+
+        self.assertEqual(ctx.exception.status_code, 429)
+        self.assertEqual(ctx.exception.retry_after_header, '30')
+        self.assertEqual(controller.run('fetch', lambda: 'ok', 'fetch'), 'ok')
+        self.assertEqual(counter.counts, {('fetch', 'shed'): 1, ('fetch', 'admitted'): 1})
+
+    def test_unlimited_endpoint_runs_directly(self):
+        self.assertEqual(AdmissionController({}).run('beer', lambda: 42), 42)
+
+
+class TestAdmissionResponses(unittest.TestCase):
+
+    def test_shed_request_returns_retry_after(self):
+        limit = EndpointLimit(max_concurrent=1, max_queue=0, retry_after=7)
+        service = BeerService(tempfile.mkdtemp(), ':memory:')
+        client = create_app(service, admission=AdmissionController({'stats': limit})).test_client()
+        limit.acquire('stats')
+
+        response = client.get('/api/stats')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '7')
+        self.assertEqual(response.get_json()['status'], 'error')
+
+    def test_shed_request_is_not_counted_as_a_run(self):
+        limit = EndpointLimit(max_concurrent=1, max_queue=0)
+        service = BeerService(tempfile.mkdtemp(), ':memory:')
+        client = create_app(service, admission=AdmissionController({'analyze': limit})).test_client()
+        limit.acquire('analyze')
+        before = app_module.ANALYSIS_COUNTER._value.get()
+
+        response = client.get('/api/analyze')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(app_module.ANALYSIS_COUNTER._value.get(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
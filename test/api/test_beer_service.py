@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from src.app import create_app, warm_up, reinit_after_fork, register_warm_up_hook
+from api.beer_service import BeerService
+
+
+class TestLazyInitialization(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.data_dir = os.path.join(self.tmp_dir, 'data')
+        self.service = BeerService(self.data_dir, ':memory:')
+
+    def test_construction_touches_nothing(self):
+        create_app(self.service)
+        self.assertIsNone(self.service._db_manager)
+        self.assertIsNone(self.service._event_publisher)
+        self.assertFalse(os.path.exists(self.data_dir))
+
+    def test_subsystems_created_on_first_use(self):
+        self.assertEqual(self.service.get_all_beers(), [])
+        self.assertIsNotNone(self.service._db_manager)
+        self.assertTrue(self.service.event_publisher.is_alive())
+
+    def test_warm_up_runs_service_and_registered_hooks(self):
+        flask_app = create_app(self.service)
+        calls = []
+        register_warm_up_hook(flask_app, calls.append)
+
+        warm_up(flask_app)
+
+        self.assertEqual(calls, [flask_app])
+        self.assertTrue(os.path.isdir(self.data_dir))
+        self.assertIsNotNone(self.service._db_manager)
+
+    def test_warm_up_failures_do_not_stop_boot(self):
+        os.makedirs(self.data_dir)
+        with open(os.path.join(self.data_dir, 'raw_data_page=1.json'), 'w') as f:
+            f.write('[{"id": 1, "na')
+        flask_app = create_app(self.service)
+        calls = []
+
+        def broken_hook(app):
+            raise RuntimeError('boom')
+
+        register_warm_up_hook(flask_app, broken_hook)
+        register_warm_up_hook(flask_app, calls.append)
+
+        warm_up(flask_app)
+
+        self.assertEqual(self.service.warm_up(), ['analyzer'])
+        self.assertEqual(calls, [flask_app])
+        self.assertTrue(self.service.event_publisher.is_alive())
+
+    def test_readiness_reports_uncreatable_data_dir(self):
+        blocker = os.path.join(self.tmp_dir, 'file')
+        open(blocker, 'w').close()
+        service = BeerService(os.path.join(blocker, 'data'), ':memory:')
+        client = create_app(service).test_client()
+
+        response = client.get('/health/ready')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()['checks']['data_dir']['status'], 'not writable')
+
+    def test_reinit_after_fork_recreates_worker_thread(self):
+        flask_app = create_app(self.service)
+        publisher = self.service.event_publisher
+
+        reinit_after_fork(flask_app)
+
+        self.assertIsNot(self.service.event_publisher, publisher)
+        self.assertTrue(self.service.event_publisher.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
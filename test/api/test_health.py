@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.api.health import HealthChecker
+
+
+class TestHealthChecker(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.service = Mock()
+        self.service.data_dir = self.data_dir
+        self.service.last_fetch_success = None
+        self.service.db_manager.ping.return_value = True
+        self.service.event_publisher.is_alive.return_value = True
+        self.service.event_publisher.queue_depth.return_value = 0
+
+    def test_ready_when_all_checks_pass(self):
+        result = HealthChecker(self.service).readiness()
+        self.assertTrue(result['success'])
+        self.assertEqual(result['status'], 'healthy')
+        self.assertEqual(result['checks']['database']['status'], 'connected')
+
+    def test_readiness_is_cached_within_ttl(self):
+        checker = HealthChecker(self.service, ttl=60)
+        checker.readiness()
+        checker.readiness()
+        self.assertEqual(self.service.db_manager.ping.call_count, 1)
+
+    def test_not_ready_when_database_fails(self):
+        self.service.db_manager.ping.side_effect = Exception('database is locked')
+        result = HealthChecker(self.service).readiness()
+        self.assertFalse(result['success'])
+        self.assertEqual(result['checks']['database']['error'], 'database is locked')
+
+    def test_not_ready_when_worker_is_dead_or_backlogged(self):
+        self.service.event_publisher.queue_depth.return_value = 5
+        result = HealthChecker(self.service, max_queue_depth=2).readiness()
+        self.assertFalse(result['checks']['event_publisher']['ok'])
+
+        self.service.event_publisher.queue_depth.return_value = 0
+        self.service.event_publisher.is_alive.return_value = False
+        result = HealthChecker(self.service).readiness()
+        self.assertFalse(result['success'])
+
+    def test_stale_fetch_fails_only_when_limit_set(self):
+        self.service.last_fetch_success = 0.0
+        self.assertTrue(HealthChecker(self.service).readiness()['success'])
+        self.assertFalse(HealthChecker(self.service, max_fetch_age=60).readiness()['success'])
+
+    def test_liveness_does_not_touch_dependencies(self):
+        result = HealthChecker(self.service).liveness()
+        self.assertEqual(result['status'], 'alive')
+        self.service.db_manager.ping.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
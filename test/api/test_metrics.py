@@ -0,0 +1,98 @@
+import unittest
+import sys
+import os
+import glob
+import tempfile
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from prometheus_client import CollectorRegistry, generate_latest
+from prometheus_client.mmap_dict import MmapedDict, mmap_key
+
+from src.api import metrics
+from src.api.metrics import CachedMultiProcessCollector, mark_worker_dead, reset_multiprocess_dir
+
+
+def write_worker_file(path, typ, pid, values):
+    filename = os.path.join(path, f'{typ}_{pid}.db')
+    mmap = MmapedDict(filename)
+    for (name, labels), value in values.items():
+        labels = dict(labels)
+        key = mmap_key(name, name + '_total', list(labels), list(labels.values()), 'Test counter')
+        mmap.write_value(key, value, 0.0)
+    mmap.close()
+
+
+class TestMultiProcessMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        reset_multiprocess_dir(self.path)
+
+    def scrape(self, ttl=0):
+        registry = CollectorRegistry()
+        CachedMultiProcessCollector(registry, self.path, ttl)
+        return generate_latest(registry).decode()
+
+    def test_scrape_aggregates_all_workers(self):
+        write_worker_file(self.path, 'counter', 101, {('data_fetch', ()): 2.0})
+        write_worker_file(self.path, 'counter', 102, {('data_fetch', ()): 3.0})
+
+        self.assertIn('data_fetch_total 5.0', self.scrape())
+
+    def test_dead_worker_is_folded_into_archive(self):
+        labels = (('endpoint', 'beers'),)
+        write_worker_file(self.path, 'counter', 101, {('hits', labels): 2.0})
+        write_worker_file(self.path, 'counter', 102, {('hits', labels): 3.0})
+        write_worker_file(self.path, 'counter', 103, {('hits', labels): 4.0})
+
+        mark_worker_dead(101, self.path)
+        mark_worker_dead(102, self.path)
+
+        files = sorted(os.path.basename(f) for f in glob.glob(os.path.join(self.path, '*.db')))
+        self.assertEqual(files, ['counter_103.db', 'counter_archive.db'])
+        self.assertIn('hits_total{endpoint="beers"} 9.0', self.scrape())
+
+    def test_interrupted_fold_is_finished_without_double_counting(self):
+        real_remove, real_replace = os.remove, os.replace
+
+        def crash_removing_dead_file(filename):
+            if filename.endswith('counter_101.db'):
+                raise OSError('crash')
+            real_remove(filename)
+
+        def crash_replacing_archive(src, dst):
+            if dst.endswith('counter_archive.db'):
+                raise OSError('crash')
+            real_replace(src, dst)
+
+        for crash in (mock.patch.object(metrics.os, 'remove', crash_removing_dead_file),
+                      mock.patch.object(metrics.os, 'replace', crash_replacing_archive)):
+            reset_multiprocess_dir(self.path)
+            write_worker_file(self.path, 'counter', 100, {('hits', ()): 1.0})
+            mark_worker_dead(100, self.path)
+            write_worker_file(self.path, 'counter', 101, {('hits', ()): 2.0})
+            write_worker_file(self.path, 'counter', 102, {('hits', ()): 4.0})
+
+            with crash, self.assertRaises(OSError):
+                mark_worker_dead(101, self.path)
+            self.assertNotIn('hits_total 9.0', self.scrape())
+
+            mark_worker_dead(102, self.path)
+            files = sorted(os.path.basename(f) for f in glob.glob(os.path.join(self.path, 'counter_*')))
+            self.assertEqual(files, ['counter_archive.db'])
+            self.assertIn('hits_total 7.0', self.scrape())
+
+    def test_scrape_result_is_cached_for_ttl(self):
+        registry = CollectorRegistry()
+        CachedMultiProcessCollector(registry, self.path, ttl=60)
+        write_worker_file(self.path, 'counter', 101, {('data_fetch', ()): 1.0})
+        generate_latest(registry)
+        write_worker_file(self.path, 'counter', 102, {('data_fetch', ()): 1.0})
+
+        self.assertIn('data_fetch_total 1.0', generate_latest(registry).decode())
+
+
+if __name__ == "__main__":
+    unittest.main()
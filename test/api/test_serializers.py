@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from src.app import create_app
+from src.api import serializers
+from src.api.serializers import JSONSerializer, RawJSON, StdlibJSONSerializer, OrjsonSerializer, wrap_raw_fields
+from api.beer_service import BeerService
+
+
+class TestJSONSerializers(unittest.TestCase):
+
+    def backends(self):
+        yield StdlibJSONSerializer()
+        if serializers.orjson is not None:
+            yield OrjsonSerializer()
+
+    def test_raw_json_is_spliced_verbatim(self):
+        payload = {'beers': [{'id': 1, 'ingredients': RawJSON('{"hops":[{"name":"Fuggles"}]}')}]}
+        for serializer in self.backends():
+            decoded = json.loads(serializer.dumps(payload))
+            self.assertEqual(decoded['beers'][0]['ingredients'], {'hops': [{'name': 'Fuggles'}]})
+
+    def test_plain_payload_round_trips(self):
+        payload = {'status': 'success', 'name': 'Ünïcode \x00 beer', 'abv': 4.5, 'tags': None}
+        for serializer in self.backends():
+            self.assertEqual(json.loads(serializer.dumps(payload)), payload)
+
+    def test_unknown_type_raises(self):
+        for serializer in self.backends():
+            with self.assertRaises(TypeError):
+                serializer.dumps({'value': object()})
+
+    def test_base_serializer_is_abstract(self):
+        with self.assertRaises(TypeError):
+            JSONSerializer()
+
+    def test_wrap_raw_fields_skips_missing_values(self):
+        rows = wrap_raw_fields([{'ingredients': '{}'}, {'ingredients': None}], ['ingredients'])
+        self.assertIsInstance(rows[0]['ingredients'], RawJSON)
+        self.assertIsNone(rows[1]['ingredients'])
+
+    @unittest.skipIf(serializers.msgpack is None, 'msgpack not installed')
+    def test_msgpack_decodes_raw_json(self):
+        packed = serializers.MsgpackSerializer().dumps({'ingredients': RawJSON('{"malt":[]}')})
+        self.assertEqual(serializers.msgpack.unpackb(packed), {'ingredients': {'malt': []}})
+
+
+class TestNegotiatedResponses(unittest.TestCase):
+
+    def test_responses_vary_on_accept(self):
+        client = create_app(BeerService(tempfile.mkdtemp(), ':memory:')).test_client()
+
+        response = client.get('/api/beers')
+
+        self.assertIn('Accept', response.vary)
+
+
+if __name__ == "__main__":
+    unittest.main()
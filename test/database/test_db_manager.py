@@ -0,0 +1,40 @@
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.database.db_manager import DatabaseManager
+
+
+class TestPing(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, 'beer_data.db')
+
+    def test_ping_succeeds_on_valid_database(self):
+        self.assertTrue(DatabaseManager(self.db_path).ping())
+        self.assertTrue(DatabaseManager(':memory:').ping())
+
+    def test_ping_fails_on_corrupt_database(self):
+        db = DatabaseManager(self.db_path)
+        with open(self.db_path, 'wb') as f:
+            f.write(b'not a database file' * 100)
+
+        with self.assertRaises(sqlite3.DatabaseError):
+            db.ping()
+
+    def test_ping_fails_on_missing_database_without_creating_it(self):
+        db = DatabaseManager(self.db_path)
+        os.remove(self.db_path)
+
+        with self.assertRaises(sqlite3.OperationalError):
+            db.ping()
+        self.assertFalse(os.path.exists(self.db_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
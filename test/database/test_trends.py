@@ -0,0 +1,127 @@
+import unittest
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.database import trends
+from src.database.db_manager import DatabaseManager
+
+
+def beer(beer_id, abv, hops=('Fuggles',)):
+    return {
+        'id': beer_id,
+        'name': f'Beer {beer_id}',
+        'abv': abv,
+        'ibu': 40.0,
+        'ingredients': {'hops': [{'name': hop} for hop in hops]}
+    }
+
+
+class TestTrends(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DatabaseManager(':memory:')
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_history_appends_only_new_or_changed_versions(self):
+        self.db.save_beers_bulk([beer(1, 5.0), beer(2, 6.0)], observed_at=datetime(2024, 1, 1, 10))
+        self.db.save_beers_bulk([beer(1, 5.0), beer(2, 6.5)], observed_at=datetime(2024, 1, 2, 10))
+
+        self.assertEqual([row['change'] for row in self.db.get_beer_history(1)], ['added'])
+        history = self.db.get_beer_history(2)
+        self.assertEqual([row['change'] for row in history], ['added', 'changed'])
+        self.assertEqual([row['abv'] for row in history], [6.0, 6.5])
+
+    def test_beer_repeated_across_batches_counts_once_per_run(self):
+        beers = [beer(1, 5.0), beer(1, 6.0), beer(1, 7.0, ('Citra',))]
+        self.db.save_beers_bulk(beers, batch_size=1, observed_at=datetime(2024, 1, 1, 10))
+
+        history = self.db.get_beer_history(1)
+        self.assertEqual([(row['change'], row['abv']) for row in history], [('added', 7.0)])
+        self.assertEqual(self.db.get_beer_by_id(1)['abv'], 7.0)
+
+        bucket, = self.db.get_trends('day')
+        self.assertEqual(bucket['beers_added'], 1)
+        self.assertEqual(bucket['beers_changed'], 0)
+        self.assertEqual(bucket['abv']['count'], 1)
+        self.assertEqual(bucket['abv']['min'], 7.0)
+        self.assertEqual(bucket['top_hops'], {'Citra': 1})
+
+    def test_change_reverted_within_run_is_not_recorded(self):
+        self.db.save_beers_bulk([beer(1, 5.0)], observed_at=datetime(2024, 1, 1, 10))
+        self.db.save_beers_bulk([beer(1, 6.0), beer(1, 5.0)], batch_size=1, observed_at=datetime(2024, 1, 2, 10))
+
+        self.assertEqual([row['abv'] for row in self.db.get_beer_history(1)], [5.0])
+        self.assertEqual([b['bucket_start'] for b in self.db.get_trends('day')], ['2024-01-01 00:00:00'])
+
+    def test_string_ids_match_stored_beers(self):
+        self.db.save_beers_bulk([beer(1, 5.0)], observed_at=datetime(2024, 1, 1, 10))
+        self.db.save_beers_bulk([dict(beer(1, 5.0), id='1'), dict(beer(2, 5.0), id='2')],
+                                observed_at=datetime(2024, 1, 2, 10))
+
+        self.assertEqual(len(self.db.get_beer_history(1)), 1)
+        self.assertEqual([b['beers_added'] for b in self.db.get_trends('day')], [1, 1])
+
+    def test_interrupted_ingest_still_updates_rollups(self):
+        def beers():
+            for beer_id in range(1, 5):
+                yield beer(beer_id, 5.0)
+            raise ValueError('bad line')
+
+        with self.assertRaises(ValueError):
+            self.db.save_beers_bulk(beers(), batch_size=2, observed_at=datetime(2024, 1, 1, 10))
+
+        bucket, = self.db.get_trends('day')
+        self.assertEqual(bucket['beers_added'], 4)
+
+    def test_unfinished_run_is_folded_by_next_run(self):
+        conn = self.db._conn
+        run_id, observed_at = trends.start_run(conn, 'crashed', datetime(2024, 1, 1, 10))
+        rows = [(1, 'Beer 1', None, 5.0, 40.0, None, '{}')]
+        trends.record_changes(conn, run_id, observed_at, rows)
+        conn.executemany('INSERT INTO beers (id, name, tagline, abv, ibu, description, ingredients) '
+                         'VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+        conn.commit()
+
+        self.db.save_beers_bulk([beer(2, 6.0)], observed_at=datetime(2024, 1, 2, 10))
+
+        self.assertEqual([b['beers_added'] for b in self.db.get_trends('day')], [1, 1])
+        self.db.save_beers_bulk([], observed_at=datetime(2024, 1, 3, 10))
+        self.assertEqual([b['beers_added'] for b in self.db.get_trends('day')], [1, 1])
+
+    def test_daily_rollups_track_additions_distribution_and_hops(self):
+        self.db.save_beers_bulk([beer(1, 4.0), beer(2, 6.0, ('Citra',))], observed_at=datetime(2024, 1, 1, 9))
+        self.db.save_beers_bulk([beer(3, 8.0, ('Citra',))], observed_at=datetime(2024, 1, 1, 17))
+        self.db.save_beers_bulk([beer(3, 9.0, ('Citra', 'Simcoe'))], observed_at=datetime(2024, 1, 2, 8))
+
+        buckets = self.db.get_trends('day')
+
+        self.assertEqual([b['bucket_start'] for b in buckets], ['2024-01-01 00:00:00', '2024-01-02 00:00:00'])
+        first, second = buckets
+        self.assertEqual(first['beers_added'], 3)
+        self.assertEqual(first['abv']['mean'], 6.0)
+        self.assertEqual(first['abv']['min'], 4.0)
+        self.assertEqual(first['abv']['max'], 8.0)
+        self.assertEqual(first['top_hops'], {'Citra': 2, 'Fuggles': 1})
+        self.assertEqual(second['beers_added'], 0)
+        self.assertEqual(second['beers_changed'], 1)
+
+    def test_range_and_granularity(self):
+        self.db.save_beers_bulk([beer(1, 5.0)], observed_at=datetime(2024, 1, 1, 9, 30))
+        self.db.save_beers_bulk([beer(2, 5.0)], observed_at=datetime(2024, 1, 1, 11, 5))
+
+        hours = self.db.get_trends('hour', start='2024-01-01T10:00', end='2024-01-02')
+
+        self.assertEqual([b['bucket_start'] for b in hours], ['2024-01-01 11:00:00'])
+        with self.assertRaises(ValueError):
+            self.db.get_trends('week')
+        with self.assertRaises(ValueError):
+            self.db.get_trends('day', start='yesterday')
+
+
+if __name__ == "__main__":
+    unittest.main()
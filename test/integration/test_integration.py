@@ -56,6 +56,12 @@ class TestIntegration(unittest.TestCase):
         response = self.app.get('/health')
         self.assertEqual(response.status_code, 200)
         
+        response = self.app.get('/health/live')
+        self.assertEqual(response.status_code, 200)
+        
+        response = self.app.get('/health/ready')
+        self.assertEqual(response.status_code, 200)
+        
         response = self.app.get('/metrics')
         self.assertEqual(response.status_code, 200)
         
@@ -64,6 +70,12 @@ class TestIntegration(unittest.TestCase):
         
         response = self.app.get('/api/stats')
         self.assertEqual(response.status_code, 200)
+        
+        response = self.app.get('/api/trends?granularity=hour')
+        self.assertEqual(response.status_code, 200)
+        
+        response = self.app.get('/api/trends?granularity=week')
+        self.assertEqual(response.status_code, 400)
 
 if __name__ == '__main__':
     unittest.main()
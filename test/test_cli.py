@@ -0,0 +1,80 @@
+import unittest
+import sys
+import os
+import io
+import csv
+import json
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import cli
+from src.database.db_manager import DatabaseManager
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, 'cli.db')
+        beers = list(cli.synthetic_beers(10))
+
+        self.ndjson_path = os.path.join(self.tmp_dir, 'beers.ndjson')
+        with open(self.ndjson_path, 'w') as f:
+            for beer in beers[:6]:
+                f.write(json.dumps(beer) + '\n')
+
+        self.data_dir = os.path.join(self.tmp_dir, 'data')
+        os.makedirs(self.data_dir)
+        with open(os.path.join(self.data_dir, 'raw_data_page=1.json'), 'w') as f:
+            json.dump(beers[6:], f)
+
+    def test_ingest_reads_ndjson_and_page_directories(self):
+        code = cli.main(['--db', self.db_path, '--quiet', 'ingest', self.ndjson_path, self.data_dir])
+        self.assertEqual(code, 0)
+        self.assertEqual(DatabaseManager(self.db_path).count_beers(), 10)
+
+    def test_export_ndjson_keeps_ingredients_structured(self):
+        db = DatabaseManager(self.db_path)
+        cli.ingest(db, [self.ndjson_path], show_progress=False)
+
+        output = io.BytesIO()
+        stats = cli.export(db, output, 'ndjson', show_progress=False)
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(stats['rows'], 6)
+        self.assertEqual(json.loads(lines[0])['ingredients']['yeast'], 'Wyeast 1056 - American Ale')
+
+    def test_export_csv(self):
+        db = DatabaseManager(self.db_path)
+        cli.ingest(db, [self.ndjson_path], show_progress=False)
+
+        output = io.BytesIO()
+        cli.export(db, output, 'csv', show_progress=False)
+
+        rows = list(csv.DictReader(io.StringIO(output.getvalue().decode('utf-8'))))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]['name'], 'Beer 1')
+
+    def test_analyze_files_and_db_agree(self):
+        db = DatabaseManager(self.db_path)
+        cli.ingest(db, [self.data_dir], show_progress=False)
+
+        from_files = cli.analyze(self.data_dir, workers=2, show_progress=False)
+        from_db = cli.analyze(self.data_dir, db=db, show_progress=False)
+
+        self.assertEqual(from_files['total_beers'], 4)
+        self.assertEqual(from_files, from_db)
+
+    def test_summarize_stream_reports_progress_per_row(self):
+        stream = io.StringIO()
+        progress = cli.Progress('analyze', interval=0, stream=stream)
+
+        stats = cli.summarize_stream(cli.synthetic_beers(3), progress)
+
+        self.assertEqual(stats['total_beers'], 3)
+        self.assertEqual(stream.getvalue().count('\n'), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()